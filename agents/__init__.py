@@ -1,17 +1,41 @@
 """
 BudgetBuddy AI Agents Module
 Multi-agent financial planning system
+
+Public names are imported on first access, so `import agents` stays cheap
+and pandas, matplotlib or transformers load only when an agent needs them.
 """
 
-from agents.tracker_agent import TrackerAgent
-from agents.advisor_agent import AdvisorAgent
-from agents.visualizer_agent import VisualizerAgent
-from agents.database import DatabaseManager
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'TrackerAgent': 'agents.tracker_agent',
+    'AdvisorAgent': 'agents.advisor_agent',
+    'VisualizerAgent': 'agents.visualizer_agent',
+    'DatabaseManager': 'agents.database',
+    'ExpenseCube': 'agents.expense_cube'
+}
 
 __all__ = [
     'TrackerAgent',
     'AdvisorAgent',
     'VisualizerAgent',
-    'DatabaseManager'
+    'DatabaseManager',
+    'ExpenseCube'
 ]
 
+
+def __getattr__(name):
+    """Import the submodule defining a public name on first access"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include the lazily loaded names in dir(agents)"""
+    return sorted(set(globals()) | set(__all__))
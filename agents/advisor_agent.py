@@ -4,38 +4,96 @@ An intelligent agent that analyzes expenses and provides financial advice using
 """
 
 import pandas as pd
+import numpy as np
+import calendar
+import hashlib
+import time
 from datetime import datetime
 from agents.database import DatabaseManager
-from transformers import pipeline
+from agents.analytics import AnalyticsEngine
+from agents.expense_cube import ExpenseCube, parse_dates, row_hashes, week_numbers
+from agents.model_registry import model_registry, stream_pipeline, generation_lock
+from agents.inference_worker import InferenceError
 
 
 class AdvisorAgent:
     """Agent responsible for analyzing expenses and providing financial advice"""
     
-    def __init__(self, model_name="facebook/bart-large-cnn"):
+    # Bump when the analysis or report logic changes so cached results are recomputed
+    ANALYSIS_VERSION = 2
+    
+    def __init__(self, model_name="facebook/bart-large-cnn", task="summarization",
+                 use_model=False, warm_up=False, inference_client=None, stream_deadline=20.0,
+                 analytics=None, db=None):
         """
         Initialize the advisor agent with a summarization model
         
         Args:
             model_name: Hugging Face model name for summarization
                        Options: "facebook/bart-large-cnn", "t5-base", "google/flan-t5-base"
+            task: Hugging Face pipeline task for model_name
+            use_model: Generate advice with the model instead of the rule-based system;
+                       the model is loaded from the shared registry on first request
+            warm_up: Start loading the model in the background right away
+            inference_client: Optional InferenceClient; when given, the model runs in the
+                              shared inference worker process instead of this one, and
+                              slow or failed requests fall back to rule-based advice
+            stream_deadline: Seconds streamed advice may take before cutting over to
+                             the rule-based report
+            analytics: Optional AnalyticsEngine (e.g. the TrackerAgent's) answering
+                       period analyses from running aggregates
+            db: Optional DatabaseManager to use instead of the default database
         """
         self.model_name = model_name
+        self.task = task
         # Use intelligent rule-based system (more reliable than current AI models)
         # The dynamic rule-based system provides better, personalized insights
-        self.generator = None
-        self.use_summarization = False
+        self.use_model = use_model
+        self.use_summarization = task == "summarization"
+        self.model_error = None
+        self.inference_client = inference_client
+        self.stream_deadline = stream_deadline
+        
+        if use_model and warm_up and inference_client is None:
+            model_registry.warm_up(task, model_name)
         
-        self.db = DatabaseManager()
+        self.db = db if db is not None else DatabaseManager()
+        self.analytics = analytics if analytics is not None else AnalyticsEngine(self.db)
+    
+    @property
+    def generator(self):
+        """
+        Shared Hugging Face pipeline, loaded on first access
+        
+        Returns:
+            Pipeline, or None when model advice is disabled or cannot be loaded
+        """
+        if not self.use_model:
+            return None
+        try:
+            return model_registry.get(self.task, self.model_name)
+        except Exception as e:
+            # Missing transformers/torch or an unavailable model: use rule-based advice
+            self.model_error = str(e)
+            return None
+    
+    def model_stats(self):
+        """Load time and memory footprint of this agent's model, if it has been loaded"""
+        for entry in model_registry.stats():
+            if entry['task'] == self.task and entry['model_name'] == self.model_name:
+                return entry
+        return None
     
     def analyze_spending_patterns(self, expenses_df, year=None, month=None):
         """
         Agent task: Analyze spending patterns with intelligent reasoning
         
-        This agentic function detects trends, insights, and patterns in spending data
+        This agentic function detects trends, insights, and patterns in spending data.
+        expenses_df is treated as read-only.
         
         Args:
-            expenses_df: DataFrame with expense data
+            expenses_df: DataFrame with expense data, or an ExpenseCube of it
+                         (its precomputed totals are used without regrouping)
             year: Optional year filter
             month: Optional month filter
             
@@ -43,21 +101,183 @@ class AdvisorAgent:
             Dictionary with comprehensive spending analysis
         """
         if expenses_df.empty:
-            return {
-                'total_spent': 0,
-                'category_breakdown': {},
-                'average_daily': 0,
-                'top_category': None,
-                'num_transactions': 0,
-                'trends': [],
-                'insights': []
-            }
+            return self._empty_analysis()
+        
+        if isinstance(expenses_df, ExpenseCube):
+            aggregates = self._aggregate_cube(expenses_df)
+        else:
+            aggregates = self._aggregate_expenses(expenses_df)
+        
+        return self._build_analysis(aggregates)
+    
+    def analyze_period(self, start_date=None, end_date=None):
+        """
+        Analyze a date range from the running aggregates, without reading raw rows
+        
+        Args:
+            start_date: Optional first day (inclusive), as a date or YYYY-MM-DD string
+            end_date: Optional last day (inclusive), as a date or YYYY-MM-DD string
+            
+        Returns:
+            Dictionary in the same form as analyze_spending_patterns
+        """
+        start_date = None if start_date is None else pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        end_date = None if end_date is None else pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        aggregates = self.analytics.aggregates(start_date, end_date)
+        if aggregates['num_transactions'] == 0:
+            return self._empty_analysis()
+        return self._build_analysis(aggregates)
+    
+    def analyze_month(self, year, month):
+        """
+        Analyze one month from the running aggregates
         
-        # Calculate total spending
-        total_spent = expenses_df['amount'].sum()
+        Args:
+            year: Year
+            month: Month (1-12)
+            
+        Returns:
+            Dictionary in the same form as analyze_spending_patterns
+        """
+        last_day = calendar.monthrange(year, month)[1]
+        return self.analyze_period(f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last_day:02d}")
+    
+    @staticmethod
+    def _empty_analysis():
+        """Analysis result for a period without expenses"""
+        return {
+            'total_spent': 0,
+            'category_breakdown': {},
+            'average_daily': 0,
+            'top_category': None,
+            'num_transactions': 0,
+            'trends': [],
+            'insights': []
+        }
+    
+    @staticmethod
+    def _aggregate_expenses(expenses_df):
+        """
+        Compute every aggregate the analysis needs in one grouped pass
         
-        # Category breakdown
-        category_summary = expenses_df.groupby('category')['amount'].sum().to_dict()
+        Args:
+            expenses_df: Non-empty DataFrame with 'amount' and optional 'category'/'date'
+            
+        Returns:
+            Dictionary with total_spent, num_transactions, category_totals
+            (sorted by category), weekly_totals (chronological list) and days
+            (calendar days spanned, or None without dates)
+        """
+        return AdvisorAgent._aggregate_groups(expenses_df, np.zeros(len(expenses_df), dtype='int64'), 1)[0]
+    
+    @staticmethod
+    def _aggregate_cube(cube):
+        """
+        Read the analysis aggregates from an ExpenseCube's precomputed totals
+        
+        Args:
+            cube: Non-empty ExpenseCube
+            
+        Returns:
+            Dictionary in the form returned by _aggregate_expenses
+        """
+        return {
+            'total_spent': cube.total_spent,
+            'num_transactions': cube.num_transactions,
+            'category_totals': {category: float(total) for category, total in cube.category_totals().items()},
+            # ISO weeks with transactions, oldest first
+            'weekly_totals': cube.period_totals('W', dense=False).tolist(),
+            'days': cube.day_span
+        }
+    
+    @staticmethod
+    def _aggregate_groups(expenses_df, group_codes, num_groups, dates=None):
+        """
+        Compute analysis aggregates for several groups of rows (e.g. months) in one pass
+        
+        Rows are bucketed by (group, ISO week, category) with a single integer key,
+        so every group's category totals, weekly totals and grand total come out
+        of the same two bincounts.
+        
+        Args:
+            expenses_df: DataFrame with 'amount' and optional 'category'/'date'
+            group_codes: Integer array assigning each row to a group in [0, num_groups)
+            num_groups: Number of groups
+            dates: Optional already-parsed date column of expenses_df
+            
+        Returns:
+            List with one aggregates dictionary per group, as returned by
+            _aggregate_expenses
+        """
+        amounts = expenses_df['amount'].to_numpy(dtype='float64', na_value=0.0)
+        num_rows = len(amounts)
+        
+        # Category slot per row; rows without a category go to an extra slot
+        if 'category' in expenses_df.columns:
+            category_codes, categories = pd.factorize(expenses_df['category'], sort=True)
+        else:
+            category_codes, categories = np.full(num_rows, -1), []
+        num_slots = len(categories) + 1
+        category_codes = np.where(category_codes < 0, num_slots - 1, category_codes)
+        
+        days = [None] * num_groups
+        week_codes = np.zeros(num_rows, dtype='int64')
+        num_weeks = 0
+        if 'date' in expenses_df.columns:
+            if dates is None:
+                dates = parse_dates(expenses_df['date'])
+            valid = dates.notna().to_numpy()
+            days = [0] * num_groups
+            if valid.any():
+                day_numbers = dates.to_numpy().astype('datetime64[D]').astype('int64')
+                weeks = week_numbers(day_numbers)
+                first_week = weeks[valid].min()
+                num_weeks = int(weeks[valid].max() - first_week) + 1
+                # Rows without a usable date go to an extra week after the last one
+                week_codes = np.where(valid, weeks - first_week, num_weeks)
+                if num_groups == 1:
+                    days[0] = int(day_numbers[valid].max() - day_numbers[valid].min()) + 1
+                else:
+                    spans = pd.Series(day_numbers[valid]).groupby(group_codes[valid]).agg(['min', 'max'])
+                    for group, low, high in spans.itertuples():
+                        days[group] = int(high - low) + 1
+        
+        keys = (group_codes * (num_weeks + 1) + week_codes) * num_slots + category_codes
+        shape = (num_groups, num_weeks + 1, num_slots)
+        size = num_groups * (num_weeks + 1) * num_slots
+        sums = np.bincount(keys, weights=amounts, minlength=size).reshape(shape)
+        counts = np.bincount(keys, minlength=size).reshape(shape)
+        
+        results = []
+        for group in range(num_groups):
+            category_sums = sums[group, :, :-1].sum(axis=0)
+            category_counts = counts[group, :, :-1].sum(axis=0)
+            weekly_sums = sums[group, :num_weeks].sum(axis=1)
+            weekly_counts = counts[group, :num_weeks].sum(axis=1)
+            results.append({
+                'total_spent': float(sums[group].sum()),
+                'num_transactions': int(counts[group].sum()),
+                'category_totals': {category: float(total) for category, total, count
+                                    in zip(categories, category_sums, category_counts) if count},
+                # Only weeks that have transactions, oldest first
+                'weekly_totals': weekly_sums[weekly_counts > 0].tolist(),
+                'days': days[group]
+            })
+        return results
+    
+    def _build_analysis(self, aggregates):
+        """
+        Turn precomputed aggregates into the analysis dictionary
+        
+        Args:
+            aggregates: Dictionary as returned by _aggregate_expenses
+            
+        Returns:
+            Dictionary with comprehensive spending analysis
+        """
+        total_spent = aggregates['total_spent']
+        num_transactions = aggregates['num_transactions']
+        category_summary = aggregates['category_totals']
         category_percentages = {cat: (amt/total_spent*100) for cat, amt in category_summary.items()}
         
         # Top spending category
@@ -68,20 +288,16 @@ class AdvisorAgent:
         insights = []
         
         # Average daily spending with trend analysis
-        if 'date' in expenses_df.columns:
-            expenses_df['date'] = pd.to_datetime(expenses_df['date'])
-            days = (expenses_df['date'].max() - expenses_df['date'].min()).days + 1
+        days = aggregates['days']
+        if days is not None:
             avg_daily = total_spent / days if days > 0 else total_spent
             
             # Detect weekly spending trends
-            expenses_df['week'] = expenses_df['date'].dt.isocalendar().week
-            expenses_df['year'] = expenses_df['date'].dt.isocalendar().year
-            expenses_df['year_week'] = expenses_df['year'].astype(str) + '_' + expenses_df['week'].astype(str)
-            weekly_spending = expenses_df.groupby('year_week')['amount'].sum().sort_index()
+            weekly_spending = aggregates['weekly_totals']
             if len(weekly_spending) > 1:
-                if weekly_spending.iloc[-1] > weekly_spending.iloc[-2] * 1.2:
+                if weekly_spending[-1] > weekly_spending[-2] * 1.2:
                     trends.append("🔺 Increasing spending trend detected in recent weeks")
-                elif weekly_spending.iloc[-1] < weekly_spending.iloc[-2] * 0.8:
+                elif weekly_spending[-1] < weekly_spending[-2] * 0.8:
                     trends.append("🔻 Decreasing spending trend detected - great job!")
         else:
             avg_daily = total_spent
@@ -94,7 +310,6 @@ class AdvisorAgent:
             insights.append("📌 Heavy concentration (>70%) in top 3 categories - consider diversifying")
         
         # Agent insights: Transaction analysis
-        num_transactions = len(expenses_df)
         avg_transaction = total_spent / num_transactions if num_transactions > 0 else 0
         
         if avg_transaction > 1000:
@@ -197,7 +412,7 @@ class AdvisorAgent:
         
         return tips
     
-    def generate_ai_advice(self, analysis_summary, overspending_list, saving_tips):
+    def generate_ai_advice(self, analysis_summary, overspending_list, saving_tips, outcome=None):
         """
         Generate AI-powered financial advice using Hugging Face models
         
@@ -205,10 +420,97 @@ class AdvisorAgent:
             analysis_summary: Dictionary with spending analysis
             overspending_list: List of overspending categories
             saving_tips: List of saving tips
+            outcome: Optional dictionary; 'fallback' is set to True when model advice
+                     was requested but the rule-based report was returned
             
         Returns:
             String with AI-generated advice
         """
+        if not self.use_model:
+            return self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
+        
+        advice_prompt, generation_kwargs = self._build_advice_prompt(analysis_summary, overspending_list, saving_tips)
+        result = self._run_model(advice_prompt, generation_kwargs)
+        if not result:
+            # Fallback to rule-based advice
+            if outcome is not None:
+                outcome['fallback'] = True
+            return self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
+        
+        if self.use_summarization:
+            return result[0]['summary_text']
+        return result[0]['generated_text'].replace(advice_prompt, "").strip()
+    
+    def stream_ai_advice(self, analysis_summary, overspending_list, saving_tips, deadline=None, outcome=None):
+        """
+        Generate advice incrementally, yielding text as the model produces it
+        
+        If the model is unavailable, fails, or has not finished by the deadline,
+        the stream cuts over to the rule-based report.
+        
+        Args:
+            analysis_summary: Dictionary with spending analysis
+            overspending_list: List of overspending categories
+            saving_tips: List of saving tips
+            deadline: Seconds allowed for generation; defaults to stream_deadline
+            outcome: Optional dictionary; 'fallback' is set to True when the stream
+                     cut over to the rule-based report
+            
+        Yields:
+            Advice text fragments
+        """
+        if not self.use_model:
+            yield self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
+            return
+        
+        # The deadline covers loading the model as well as generating
+        timeout = self.stream_deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + timeout
+        advice_prompt, generation_kwargs = self._build_advice_prompt(analysis_summary, overspending_list, saving_tips)
+        produced = False
+        try:
+            if self.inference_client is not None:
+                fragments = self.inference_client.stream(self.task, self.model_name, advice_prompt,
+                                                         timeout=max(deadline_at - time.monotonic(), 0),
+                                                         **generation_kwargs)
+            else:
+                # In-process: a cold model loads on a background thread; if it is not
+                # ready in time, this request falls back and a later one uses it
+                if not model_registry.is_loaded(self.task, self.model_name):
+                    loader = model_registry.warm_up(self.task, self.model_name)
+                    loader.join(max(deadline_at - time.monotonic(), 0))
+                    if loader.is_alive():
+                        raise TimeoutError(f"{self.model_name} is still loading")
+                generator = self.generator
+                if generator is None:
+                    raise RuntimeError(self.model_error or "Model unavailable")
+                fragments = stream_pipeline(generator, advice_prompt, deadline=deadline_at, **generation_kwargs)
+            for text in fragments:
+                produced = True
+                yield text
+            if produced:
+                return
+        except Exception as e:
+            self.model_error = str(e)
+        
+        if outcome is not None:
+            outcome['fallback'] = True
+        if produced:
+            yield "\n\n⏱️ The AI model could not finish in time - here is the full rule-based report instead.\n\n"
+        yield self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
+    
+    def _build_advice_prompt(self, analysis_summary, overspending_list, saving_tips):
+        """
+        Build the model prompt and generation arguments for the configured task
+        
+        Args:
+            analysis_summary: Dictionary with spending analysis
+            overspending_list: List of overspending categories
+            saving_tips: List of saving tips
+            
+        Returns:
+            Tuple of (prompt, generation kwargs)
+        """
         # Build context for AI model
         context = f"""
         Spending Summary:
@@ -224,8 +526,7 @@ class AdvisorAgent:
         Saving Tips: {saving_tips}
         """
         
-        # Generate advice prompt
-        if self.use_summarization and self.generator:
+        if self.use_summarization:
             # Use summarization approach
             advice_prompt = f"""
             You are BudgetBuddy AI, a personal finance coach. Analyze this spending data and provide concise, actionable financial advice.
@@ -234,28 +535,45 @@ class AdvisorAgent:
             
             Provide a brief summary of their spending patterns, identify the main area of concern, and give one practical step to improve their financial health next month. Keep it encouraging and practical.
             """
-            
-            try:
-                result = self.generator(advice_prompt, max_length=150, min_length=80, do_sample=False)
-                advice = result[0]['summary_text']
-            except:
-                advice = self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
-        elif self.generator:
+            generation_kwargs = {'max_length': 150, 'min_length': 80, 'do_sample': False}
+        else:
             # Use text generation approach
             advice_prompt = f"""
             As BudgetBuddy AI, analyze this spending and give financial advice: {context}
             Advice:"""
+            generation_kwargs = {'max_new_tokens': 120, 'do_sample': False, 'temperature': 0.7}
+        
+        return advice_prompt, generation_kwargs
+    
+    def _run_model(self, prompt, generation_kwargs):
+        """
+        Run a prompt through the model, in the inference worker if one is configured
+        
+        Args:
+            prompt: Model input text
+            generation_kwargs: Generation arguments for the pipeline
             
+        Returns:
+            Pipeline output, or None if the model is unavailable, too slow or fails
+        """
+        if self.inference_client is not None:
             try:
-                result = self.generator(advice_prompt, max_new_tokens=120, do_sample=False, temperature=0.7)
-                advice = result[0]['generated_text'].replace(advice_prompt, "").strip()
-            except:
-                advice = self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
-        else:
-            # Fallback to rule-based advice
-            advice = self._generate_rule_based_advice(analysis_summary, overspending_list, saving_tips)
-        
-        return advice
+                return self.inference_client.generate(self.task, self.model_name, prompt, **generation_kwargs)
+            except InferenceError as e:
+                self.model_error = str(e)
+                return None
+        
+        # In-process: the model loads here on first use
+        generator = self.generator
+        if generator is None:
+            return None
+        try:
+            # Shared with every session's streams in this process
+            with generation_lock(generator):
+                return generator(prompt, **generation_kwargs)
+        except Exception as e:
+            self.model_error = str(e)
+            return None
     
     def _generate_rule_based_advice(self, analysis_summary, overspending_list, saving_tips):
         """
@@ -413,18 +731,61 @@ class AdvisorAgent:
         
         return "\n".join(advice_parts)
     
-    def provide_monthly_analysis(self, expenses_df, year=None, month=None):
+    def analysis_fingerprint(self, expenses_df):
+        """
+        Fingerprint a month's expenses together with the settings that shape the advice
+        
+        Row order does not matter: the same rows fetched in a different order
+        produce the same fingerprint.
+        
+        Args:
+            expenses_df: DataFrame with expense data, or an ExpenseCube of it
+            
+        Returns:
+            Hex digest string
+        """
+        if isinstance(expenses_df, ExpenseCube):
+            return self._fingerprint_rows(expenses_df.row_hashes)
+        return self._fingerprint_rows(row_hashes(expenses_df))
+    
+    def _fingerprint_rows(self, hashes):
+        """Order-independent digest of row hashes plus the advisor settings"""
+        digest = hashlib.sha1(np.sort(hashes).tobytes())
+        settings = (self.ANALYSIS_VERSION, self.use_model, self.task, self.model_name)
+        digest.update(repr(settings).encode())
+        return digest.hexdigest()
+    
+    def provide_monthly_analysis(self, expenses_df, year=None, month=None, stream=False, use_cache=True):
         """
         Comprehensive monthly analysis with AI-powered advice
         
+        When year and month are given, results are cached in the database under a
+        fingerprint of the month's expenses and the advisor settings, so an
+        unchanged month is answered without recomputing. Any change to that
+        month's expenses invalidates its entries.
+        
         Args:
-            expenses_df: DataFrame with expense data
+            expenses_df: DataFrame with expense data, or an ExpenseCube of it
             year: Optional year filter
             month: Optional month filter
+            stream: If True, 'ai_advice' is an iterator of text fragments
+                    (see stream_ai_advice) instead of a finished string
+            use_cache: Read and write the analysis cache
             
         Returns:
-            Dictionary with complete analysis and advice
+            Dictionary with complete analysis and advice; 'cached' is True when the
+            result came from the cache (its advice has already been produced once)
         """
+        cache_key = None
+        if use_cache and year and month:
+            cache_key = (f"{int(year):04d}-{int(month):02d}", self.analysis_fingerprint(expenses_df))
+            cached = self.db.get_cached_analysis(*cache_key)
+            if cached is not None:
+                cached['cached'] = True
+                if stream:
+                    cached['ai_advice'] = iter([cached['ai_advice']])
+                return cached
+        
         # Analyze spending patterns
         analysis = self.analyze_spending_patterns(expenses_df, year, month)
         
@@ -434,13 +795,105 @@ class AdvisorAgent:
         # Generate saving tips
         tips = self.generate_saving_tips(overspending)
         
-        # Generate AI advice
-        advice = self.generate_ai_advice(analysis, overspending, tips)
-        
-        return {
+        result = {
             'analysis': analysis,
             'overspending': overspending,
             'saving_tips': tips,
-            'ai_advice': advice,
-            'generated_at': datetime.now().isoformat()
+            'ai_advice': None,
+            'generated_at': datetime.now().isoformat(),
+            'cached': False
         }
+        
+        # Generate AI advice
+        outcome = {}
+        if stream:
+            result['ai_advice'] = self._stream_and_cache(
+                self.stream_ai_advice(analysis, overspending, tips, outcome=outcome),
+                result, outcome, cache_key
+            )
+        else:
+            result['ai_advice'] = self.generate_ai_advice(analysis, overspending, tips, outcome=outcome)
+            self._store_analysis(result, outcome, cache_key)
+        
+        return result
+    
+    def provide_batch_analysis(self, months=None, year=None, use_cache=True):
+        """
+        Monthly analyses for many months from one fetch and one grouped computation
+        
+        Args:
+            months: Iterable of (year, month) pairs
+            year: Analyze all twelve months of this year (used when months is None)
+            use_cache: Read and write the analysis cache, shared with provide_monthly_analysis
+            
+        Returns:
+            Dictionary of (year, month): result in the requested order; each result
+            has the same form as provide_monthly_analysis returns for that month
+        """
+        if months is None:
+            if year is None:
+                raise ValueError("Pass either months or year")
+            months = [(year, month) for month in range(1, 13)]
+        months = list(dict.fromkeys((int(y), int(m)) for y, m in months))
+        if not months:
+            return {}
+        
+        # Only the columns the analysis and its fingerprint read
+        expenses = self.db.get_expenses_by_months(months, columns=['date', 'description', 'amount', 'category'])
+        dates = parse_dates(expenses['date'])
+        
+        # Index into months for every row (the query only returns requested months)
+        month_numbers = dates.to_numpy().astype('datetime64[M]').astype('int64')
+        position = {(y - 1970) * 12 + m - 1: i for i, (y, m) in enumerate(months)}
+        group_codes = pd.Series(month_numbers).map(position).to_numpy(dtype='int64')
+        
+        hashes = row_hashes(expenses)
+        cache_keys = [(f"{y:04d}-{m:02d}", self._fingerprint_rows(hashes[group_codes == i]))
+                      for i, (y, m) in enumerate(months)]
+        cached = self.db.get_cached_analyses(cache_keys) if use_cache else {}
+        
+        aggregates = None
+        if len(cached) < len(months) and not expenses.empty:
+            aggregates = self._aggregate_groups(expenses, group_codes, len(months), dates=dates)
+        
+        results = {}
+        for i, month_key in enumerate(months):
+            cache_key = cache_keys[i]
+            if cache_key in cached:
+                results[month_key] = dict(cached[cache_key], cached=True)
+                continue
+            
+            if aggregates is None or aggregates[i]['num_transactions'] == 0:
+                analysis = self._empty_analysis()
+            else:
+                analysis = self._build_analysis(aggregates[i])
+            overspending = self.detect_overspending(analysis['category_breakdown'])
+            tips = self.generate_saving_tips(overspending)
+            outcome = {}
+            result = {
+                'analysis': analysis,
+                'overspending': overspending,
+                'saving_tips': tips,
+                'ai_advice': self.generate_ai_advice(analysis, overspending, tips, outcome=outcome),
+                'generated_at': datetime.now().isoformat(),
+                'cached': False
+            }
+            self._store_analysis(result, outcome, cache_key if use_cache else None)
+            results[month_key] = result
+        
+        return results
+    
+    def _stream_and_cache(self, fragments, result, outcome, cache_key):
+        """Pass streamed advice through, caching the result once the stream completes"""
+        parts = []
+        for text in fragments:
+            parts.append(text)
+            yield text
+        self._store_analysis(dict(result, ai_advice="".join(parts)), outcome, cache_key)
+    
+    def _store_analysis(self, result, outcome, cache_key):
+        """Cache a finished result unless caching is off or the model fell back to rules"""
+        # A fallback report would otherwise pin the month to rule-based advice
+        if cache_key is None or outcome.get('fallback'):
+            return
+        self.db.store_cached_analysis(*cache_key, {k: v for k, v in result.items() if k != 'cached'})
@@ -1,8 +1,23 @@
-from transformers import pipeline
+from agents.model_registry import model_registry, generation_lock
+from agents.inference_worker import InferenceError
 
-generator = pipeline("text2text-generation", model="google/flan-t5-base")
+MODEL_TASK = "text2text-generation"
+MODEL_NAME = "google/flan-t5-base"
 
-def generate_financial_advice(df):
+def summary_advice(summary, total_spent):
+    # Used when the inference worker is unavailable or too slow
+    if not summary or not total_spent:
+        return "No spending recorded yet - add some expenses to get advice."
+    top_category, top_amount = max(summary.items(), key=lambda item: item[1])
+    share = top_amount / total_spent * 100
+    return (
+        f"You spent ₹{total_spent:,.2f} this month, most of it on {top_category} "
+        f"(₹{top_amount:,.2f}, {share:.0f}%).\n"
+        f"Set a limit for {top_category} next month about 10% below this month's amount "
+        f"and move the difference (₹{top_amount * 0.1:,.2f}) to savings on payday."
+    )
+
+def generate_financial_advice(df, client=None):
     total_spent = df["Amount"].sum()
     summary = df.groupby("Category")["Amount"].sum().to_dict()
 
@@ -16,5 +31,14 @@ def generate_financial_advice(df):
     Respond in 4-6 lines, be practical and encouraging.
     """
 
-    result = generator(prompt, max_new_tokens=120)[0]["generated_text"]
+    # With an InferenceClient the model runs in the shared worker process;
+    # otherwise the pipeline is built on the first call, not at import time
+    if client is not None:
+        try:
+            return client.generate(MODEL_TASK, MODEL_NAME, prompt, max_new_tokens=120)[0]["generated_text"]
+        except InferenceError:
+            return summary_advice(summary, total_spent)
+    generator = model_registry.get(MODEL_TASK, MODEL_NAME)
+    with generation_lock(generator):
+        result = generator(prompt, max_new_tokens=120)[0]["generated_text"]
     return result
@@ -0,0 +1,207 @@
+"""
+Analytics Engine for BudgetBuddy AI
+Running per-day, per-category and per-week aggregates kept current incrementally
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+
+def _week_of(day):
+    """Monday-based week number for an ISO date string (same buckets as ISO weeks)"""
+    # date.toordinal() is 1 for Monday 0001-01-01
+    return (date.fromisoformat(day).toordinal() - 1) // 7
+
+
+def _day_number(day):
+    """Ordinal day number for an ISO date string"""
+    return date.fromisoformat(day).toordinal()
+
+
+class AnalyticsEngine:
+    """
+    Running sums and counts of expenses, fed from the expenses table by id
+
+    The engine remembers the highest expense id it has folded in and only
+    reads newer rows on sync(), so each new row costs O(1). The per-day,
+    per-category cells are checkpointed to SQLite, and a restart resumes
+    from the checkpoint instead of rescanning history.
+
+    Expenses are only ever inserted by this app; if rows are deleted or
+    edited outside it, call rebuild().
+    """
+
+    def __init__(self, db):
+        """
+        Initialize the engine; the checkpoint is loaded on first use
+
+        Args:
+            db: DatabaseManager holding the expenses and the checkpoint
+        """
+        self.db = db
+        self.last_id = 0
+        self._cells = {}          # day -> {category: [total, count]}
+        self._days = []           # sorted days present in _cells
+        self._daily = {}          # day -> [total, count]
+        self._weekly = {}         # week -> [total, count]
+        self._categories = {}     # category -> [total, count]
+        self._dirty = set()       # (day, category) cells changed since the last checkpoint
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _reset(self):
+        """Forget all in-memory state"""
+        self.last_id = 0
+        self._cells = {}
+        self._days = []
+        self._daily = {}
+        self._weekly = {}
+        self._categories = {}
+        self._dirty = set()
+
+    def _ensure_loaded(self):
+        """Load the checkpoint once, rebuilding if it is ahead of the database"""
+        if self._loaded:
+            return
+        last_id, cells = self.db.load_analytics_checkpoint()
+        if last_id > self.db.get_max_expense_id():
+            # The checkpoint describes rows that no longer exist (e.g. a replaced database)
+            self.db.clear_analytics_checkpoint()
+            last_id, cells = 0, []
+        for day, category, total, count in cells:
+            self._add(day, category, total, count)
+        self._dirty.clear()
+        self.last_id = last_id
+        self._loaded = True
+
+    def _add(self, day, category, amount, count=1):
+        """Fold an amount (and number of rows) into every running aggregate"""
+        by_category = self._cells.get(day)
+        if by_category is None:
+            by_category = self._cells[day] = {}
+            insort(self._days, day)
+            self._daily[day] = [0.0, 0]
+        cell = by_category.get(category)
+        if cell is None:
+            cell = by_category[category] = [0.0, 0]
+        cell[0] += amount
+        cell[1] += count
+
+        daily = self._daily[day]
+        daily[0] += amount
+        daily[1] += count
+
+        weekly = self._weekly.setdefault(_week_of(day), [0.0, 0])
+        weekly[0] += amount
+        weekly[1] += count
+
+        totals = self._categories.setdefault(category, [0.0, 0])
+        totals[0] += amount
+        totals[1] += count
+
+        self._dirty.add((day, category))
+
+    def sync(self, checkpoint=True):
+        """
+        Fold in every expense stored since the last sync
+
+        Args:
+            checkpoint: Persist the changed cells afterwards
+
+        Returns:
+            Number of expenses folded in
+        """
+        with self._lock:
+            self._ensure_loaded()
+            applied = 0
+            for expense_id, day, category, amount in self.db.iter_expense_rows_after(self.last_id):
+                self._add(day, category, amount)
+                self.last_id = expense_id
+                applied += 1
+            if checkpoint:
+                self.checkpoint()
+            return applied
+
+    def checkpoint(self):
+        """Write changed cells and the current id high-water mark to the database"""
+        with self._lock:
+            if not self._dirty:
+                return
+            cells = [(day, category) + tuple(self._cells[day][category]) for day, category in self._dirty]
+            # Refused when another engine has checkpointed further; keep the cells
+            # dirty so they are written once this engine catches up
+            if self.db.save_analytics_checkpoint(self.last_id, cells):
+                self._dirty.clear()
+
+    def rebuild(self):
+        """Discard the checkpoint and recompute everything from the expenses table"""
+        with self._lock:
+            self.db.clear_analytics_checkpoint()
+            self._reset()
+            self._loaded = True
+            self.sync()
+
+    def aggregates(self, start_date=None, end_date=None, sync=True):
+        """
+        Aggregates for an inclusive date range, in the form AdvisorAgent analyzes
+
+        Args:
+            start_date: Optional first ISO day to include
+            end_date: Optional last ISO day to include
+            sync: Fold in newly stored expenses first
+
+        Returns:
+            Dictionary with total_spent, num_transactions, category_totals
+            (sorted by category), weekly_totals (chronological, weeks with
+            transactions only) and days (calendar days spanned)
+        """
+        with self._lock:
+            if sync:
+                self.sync()
+            else:
+                self._ensure_loaded()
+
+            if start_date is None and end_date is None:
+                # Whole history straight from the running totals
+                categories = self._categories
+                weekly = self._weekly
+                days = self._days
+            else:
+                low = 0 if start_date is None else bisect_left(self._days, start_date)
+                high = len(self._days) if end_date is None else bisect_right(self._days, end_date)
+                days = self._days[low:high]
+                categories = {}
+                weekly = {}
+                for day in days:
+                    for category, (total, count) in self._cells[day].items():
+                        entry = categories.setdefault(category, [0.0, 0])
+                        entry[0] += total
+                        entry[1] += count
+                    total, count = self._daily[day]
+                    entry = weekly.setdefault(_week_of(day), [0.0, 0])
+                    entry[0] += total
+                    entry[1] += count
+
+            num_transactions = sum(count for _, count in categories.values())
+            return {
+                'total_spent': sum(total for total, _ in categories.values()),
+                'num_transactions': num_transactions,
+                'category_totals': {category: categories[category][0]
+                                    for category in sorted(categories) if categories[category][1]},
+                'weekly_totals': [weekly[week][0] for week in sorted(weekly) if weekly[week][1]],
+                'days': (_day_number(days[-1]) - _day_number(days[0]) + 1) if days else 0
+            }
+
+    def daily_totals(self, start_date=None, end_date=None):
+        """
+        Per-day totals for an inclusive date range
+
+        Returns:
+            Dictionary of ISO day: total amount, in date order
+        """
+        with self._lock:
+            self.sync()
+            low = 0 if start_date is None else bisect_left(self._days, start_date)
+            high = len(self._days) if end_date is None else bisect_right(self._days, end_date)
+            return {day: self._daily[day][0] for day in self._days[low:high]}
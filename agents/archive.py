@@ -0,0 +1,95 @@
+"""
+Expense Archive for BudgetBuddy AI
+Month-partitioned Parquet files holding closed months moved out of SQLite
+
+pyarrow is only needed once months are archived; it is imported on first use.
+"""
+
+import os
+import uuid
+
+import pandas as pd
+
+
+def _pyarrow():
+    """Import pyarrow on first use; archiving is an optional feature"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Archiving expenses needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+class ExpenseArchive:
+    """
+    One immutable Parquet file per archived month
+
+    Files are never rewritten in place: re-archiving a month writes a new file,
+    and DatabaseManager switches its archived_months index to it in the same
+    transaction that deletes the hot rows. A file the index does not point
+    to is ignored, so a crash mid-archive never duplicates rows.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize the archive
+
+        Args:
+            root: Directory holding the partition files
+        """
+        self.root = root
+
+    def path(self, name):
+        """Full path of a partition file"""
+        return os.path.join(self.root, name)
+
+    def write_month(self, month, expenses_df):
+        """
+        Write a month's expenses to a new partition file
+
+        Args:
+            month: Month as YYYY-MM
+            expenses_df: The month's rows, with the expenses table's columns
+
+        Returns:
+            File name of the partition, relative to root
+        """
+        pa, pq = _pyarrow()
+        os.makedirs(self.root, exist_ok=True)
+        name = f"{month}.{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = self.path(name + ".tmp")
+        pq.write_table(pa.Table.from_pandas(expenses_df, preserve_index=False), temp_path)
+        os.replace(temp_path, self.path(name))
+        return name
+
+    def read(self, names, columns=None, filters=None):
+        """
+        Read partitions memory-mapped, keeping only matching rows
+
+        Args:
+            names: Partition file names
+            columns: Optional list of columns to read (default: all)
+            filters: Optional pyarrow row filters, e.g. [('date', '>=', '2024-01-01')]
+
+        Returns:
+            DataFrame of the matching rows in file order
+        """
+        _, pq = _pyarrow()
+        frames = [
+            pq.read_table(self.path(name), columns=columns, filters=filters, memory_map=True).to_pandas()
+            for name in names
+        ]
+        non_empty = [frame for frame in frames if not frame.empty]
+        if len(non_empty) == 1:
+            return non_empty[0]
+        if non_empty:
+            return pd.concat(non_empty, ignore_index=True)
+        return frames[0] if frames else pd.DataFrame(columns=columns)
+
+    def remove(self, name):
+        """Delete a partition file that is no longer referenced"""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
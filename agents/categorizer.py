@@ -0,0 +1,199 @@
+"""
+Keyword Categorizer for BudgetBuddy AI
+Assigns expense categories from description keywords in a single pass
+"""
+
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+
+# Category keywords, highest priority first. A description that matches
+# keywords from several categories gets the first category listed here.
+# This order reproduces the original categorize_auto, where each later
+# category scan overwrote earlier matches.
+CATEGORY_KEYWORDS = (
+    ("Savings", ["bank", "deposit", "investment", "sip", "mutual"]),
+    ("Bills", ["electricity", "water", "rent", "insurance", "loan", "emi", "bill"]),
+    ("Education", ["school", "tuition", "course", "education", "university", "book", "study"]),
+    ("Health", ["medical", "pharmacy", "hospital", "doctor", "medicine", "health", "clinic"]),
+    ("Shopping", ["amazon", "flipkart", "shopping", "mall", "store", "purchase", "buy", "order"]),
+    ("Utilities", ["electricity", "water", "gas", "wifi", "internet", "mobile", "phone", "utility", "bill"]),
+    ("Entertainment", ["movie", "game", "netflix", "cinema", "theater", "entertainment", "spotify", "music"]),
+    ("Transport", ["uber", "bus", "train", "fuel", "taxi", "metro", "flight", "transport", "travel", "ride"]),
+    ("Food", ["restaurant", "groceries", "meal", "snack", "food", "cafe", "coffee", "starbucks", "dining", "lunch", "dinner"]),
+)
+
+
+class KeywordCategorizer:
+    """Compiled keyword matcher that categorizes a description in one scan"""
+
+    def __init__(self, category_keywords=CATEGORY_KEYWORDS):
+        """
+        Compile the keyword table
+
+        Args:
+            category_keywords: Sequence of (category, keywords) pairs, highest
+                               priority first; keywords match as lowercase substrings
+        """
+        self.categories = [category for category, _ in category_keywords]
+
+        # Each keyword belongs to the highest-priority category that lists it
+        self._rank = {}
+        for rank, (_, words) in enumerate(category_keywords):
+            for word in words:
+                self._rank.setdefault(word.lower(), rank)
+
+        # One alternation in priority order: at each position the regex picks the
+        # best keyword starting there
+        keywords = sorted(self._rank, key=self._rank.get)
+        self._pattern = re.compile("|".join(re.escape(word) for word in keywords))
+
+    def categorize(self, description):
+        """
+        Categorize a single description
+
+        Args:
+            description: Expense description
+
+        Returns:
+            Highest-priority matching category, or None if nothing matches
+        """
+        if not isinstance(description, str):
+            return None
+
+        text = description.lower()
+        search = self._pattern.search
+        best = None
+        match = search(text)
+        while match is not None:
+            rank = self._rank[match.group()]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+            # Resume one character later, not after the match, so keywords
+            # overlapping this one are still seen
+            match = search(text, match.start() + 1)
+        return None if best is None else self.categories[best]
+
+    def categorize_series(self, descriptions):
+        """
+        Categorize a Series of descriptions
+
+        Args:
+            descriptions: Series of expense descriptions
+
+        Returns:
+            Series aligned with descriptions; None where nothing matches
+        """
+        categorize = self.categorize
+        return pd.Series([categorize(d) for d in descriptions], index=descriptions.index, dtype=object)
+
+
+default_categorizer = KeywordCategorizer()
+
+
+def normalize_description(description):
+    """Cache key for a description: lowercase with collapsed whitespace"""
+    return " ".join(description.lower().split())
+
+
+class CategoryCache:
+    """Two-layer description -> category cache in front of a KeywordCategorizer; safe to share between threads"""
+
+    def __init__(self, db, categorizer=default_categorizer, maxsize=4096):
+        """
+        Initialize the cache
+
+        Args:
+            db: DatabaseManager holding the persisted category_cache table
+            categorizer: Keyword matcher used for descriptions missing from both layers
+            maxsize: Maximum number of descriptions kept in the in-process LRU
+        """
+        self.db = db
+        self.categorizer = categorizer
+        self.maxsize = maxsize
+        self._lru = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _remember_in_memory(self, key, category):
+        """Insert into the LRU, evicting the least recently used entry if full"""
+        self._lru[key] = category
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def lookup(self, descriptions):
+        """
+        Categorize descriptions, consulting each unique description once
+
+        Args:
+            descriptions: Series of expense descriptions
+
+        Returns:
+            Series aligned with descriptions; None where nothing matches
+        """
+        keys = descriptions.map(normalize_description, na_action='ignore')
+        unique_keys = [key for key in keys.unique() if isinstance(key, str)]
+
+        # The LRU and counters are shared by every thread using this cache
+        with self._lock:
+            resolved = {}
+            pending = []
+            for key in unique_keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    resolved[key] = self._lru[key]
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+            if pending:
+                stored = self.db.get_cached_categories(pending)
+                self.db_hits += len(stored)
+                learned = {}
+                for key in pending:
+                    if key in stored:
+                        category = stored[key]
+                    else:
+                        self.misses += 1
+                        category = self.categorizer.categorize(key)
+                        if category is not None:
+                            learned[key] = category
+                    resolved[key] = category
+                    self._remember_in_memory(key, category)
+                if learned:
+                    self.db.store_cached_categories(learned, source='auto')
+
+        categories = keys.map(resolved, na_action='ignore').astype(object)
+        return categories.where(categories.notna(), None)
+
+    def remember(self, description, category, source='manual'):
+        """
+        Record a known category for a description, e.g. from a manual entry
+
+        Args:
+            description: Expense description
+            category: Category chosen for it
+            source: Origin of the mapping; 'manual' overrides earlier entries
+        """
+        key = normalize_description(description)
+        with self._lock:
+            self.db.store_cached_categories({key: category}, source=source)
+            self._remember_in_memory(key, category)
+
+    def stats(self):
+        """Return hit/miss counters (counted per unique description looked up)"""
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+            'memory_size': len(self._lru)
+        }
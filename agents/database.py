@@ -6,75 +6,630 @@ Handles SQLite database setup and operations for storing expenses
 import sqlite3
 import pandas as pd
 from datetime import datetime
+from contextlib import contextmanager
 import os
+import re
+import hashlib
+import json
+import threading
+import uuid
+import heapq
+import weakref
+from agents.categorizer import normalize_description
+from agents.archive import ExpenseArchive
 
 
-class DatabaseManager:
-    """Manages SQLite database operations for BudgetBuddy"""
+class _Lease:
+    """Kept in a thread's local storage; hands the connection back when the thread exits"""
     
-    def __init__(self, db_path="database/budgetbuddy.db"):
-        """Initialize database connection"""
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.db_path = db_path
-        self._create_tables()
-    
-    def _create_tables(self):
-        """Create necessary tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Expenses table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS expenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                description TEXT NOT NULL,
-                amount REAL NOT NULL,
-                category TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+    def __init__(self, pool, conn):
+        self.conn = conn
+        weakref.finalize(self, pool._release, conn)
+
+
+class ConnectionPool:
+    """
+    Pool of persistent SQLite connections for one database file
+    
+    Each thread holds one connection for as long as it runs, so nested
+    transactions see the same connection. When the thread exits (e.g. a
+    finished Streamlit rerun) the connection goes back to a small idle list
+    for the next thread instead of being reopened and re-tuned.
+    """
+    
+    # Applied to every new connection; journal_mode=WAL persists in the file
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA temp_store=MEMORY",
+    )
+    
+    def __init__(self, db_path, timeout=30.0, max_idle=4):
+        """
+        Initialize the pool
         
-        # Advice table for storing AI-generated recommendations
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS advice (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text TEXT NOT NULL,
-                generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        Args:
+            db_path: Path to the SQLite database file
+            timeout: Seconds to wait on a locked database before failing
+            max_idle: Connections kept open for reuse once their threads exit
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._local = threading.local()
+        # Reentrant: a lease can be finalized while its own thread holds the lock
+        self._lock = threading.RLock()
+        self._connections = set()
+        self._idle = []
+        # Set once the schema has been created/migrated by this process
+        self.schema_ready = False
+        self.schema_lock = threading.Lock()
+    
+    def _open(self):
+        """Open and tune a new connection"""
+        # isolation_level=None leaves transaction control to DatabaseManager.transaction
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def connection(self):
+        """Return the calling thread's connection, taking an idle one or opening one on first use"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._open()
+                with self._lock:
+                    self._connections.add(conn)
+            lease = self._local.lease = _Lease(self, conn)
+        return lease.conn
+    
+    def _release(self, conn):
+        """Take back the connection of a thread that has exited"""
+        with self._lock:
+            if conn not in self._connections:
+                # Already closed by close_all
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._connections.discard(conn)
+        conn.close()
+    
+    def stats(self):
+        """Return the number of open and idle connections"""
+        with self._lock:
+            return {'open': len(self._connections), 'idle': len(self._idle)}
+    
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle.clear()
+            old_local, self._local = self._local, threading.local()
+        # Dropping the old leases runs their finalizers, which take the lock
+        del old_local
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """Return the process-wide connection pool for a database file"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def _reset_pools_after_fork():
+    """SQLite connections must not cross a fork; children start with fresh pools"""
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _normalize_date(value):
+    """Convert a date-like value to the ISO YYYY-MM-DD text stored in expenses"""
+    if isinstance(value, str) and _ISO_DATE.match(value):
+        return value[:10]
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d')
+    return pd.to_datetime(value).strftime('%Y-%m-%d')
+
+
+def _month_bounds(year, month):
+    """Return the half-open ISO date range [start, end) covering a month"""
+    year, month = int(year), int(month)
+    start = f"{year:04d}-{month:02d}-01"
+    end = f"{year + 1:04d}-01-01" if month == 12 else f"{year:04d}-{month + 1:02d}-01"
+    return start, end
+
+
+def expense_hash(date, description, amount, source_ref):
+    """
+    Deterministic identity of an expense row
+    
+    Args:
+        date: ISO date string
+        description: Expense description (normalized before hashing)
+        amount: Amount spent
+        source_ref: Reference distinguishing otherwise identical rows, e.g. a
+                    bank transaction id or the row's occurrence number
+                    
+    Returns:
+        Hex digest stored in expenses.content_hash
+    """
+    key = f"{date}|{normalize_description(str(description))}|{float(amount):.2f}|{source_ref}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class OccurrenceCounter:
+    """
+    Numbers identical (date, description, amount) rows of one source across the chunks of one file
+    
+    Only the counts for the date of a chunk's last row are carried into the
+    next chunk, so memory depends on the chunk size rather than the file size.
+    That is exact for statements sorted by date (in either direction), which
+    is how banks export them. A date that comes back after its counts were
+    dropped starts a new numbering segment, so its rows never collide with
+    the earlier ones; re-importing the file in the same chunks matches them.
+    """
+    
+    def __init__(self):
+        self._counts = {}      # (date, description, amount, source) -> rows seen
+        self._closed = set()   # dates whose counts have been dropped
+        self._segments = {}    # date -> numbering segment, for dates seen again
+    
+    def reference(self, date, description, amount, source=None):
+        """Return the fallback reference of the next row with this content from this source"""
+        if date in self._closed:
+            self._closed.discard(date)
+            self._segments[date] = self._segments.get(date, 0) + 1
+        key = (date, description, amount, source)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        segment = self._segments.get(date)
+        reference = f"#{count}" if segment is None else f"#{count}@{segment}"
+        # Without a source the reference is unchanged, so earlier imports still match
+        return reference if source is None else f"{source}{reference}"
+    
+    def end_chunk(self, last_date):
+        """Drop the counts of every date except the one the next chunk may continue"""
+        dropped = {key for key in self._counts if key[0] != last_date}
+        for key in dropped:
+            del self._counts[key]
+        self._closed.update(key[0] for key in dropped)
+
+
+def _content_hashes(rows, occurrences=None):
+    """
+    Hash (date, description, amount, reference, source) rows
+    
+    Rows without a reference are numbered by how often the same
+    (date, description, amount) has been seen from the same source, so two
+    identical purchases in one statement stay distinct while re-importing
+    that statement matches both of them. Identical purchases in statements
+    of different accounts only stay distinct if they carry different sources.
+    
+    Args:
+        rows: Iterable of (date, description, amount, reference-or-None, source-or-None)
+        occurrences: Optional OccurrenceCounter carried across calls (e.g. CSV chunks of one file)
         
-        # Monthly summaries table
-        cursor.execute("""
+    Returns:
+        List of hex digests
+    """
+    counter = occurrences if occurrences is not None else OccurrenceCounter()
+    hashes = []
+    date = None
+    for date, description, amount, reference, source in rows:
+        if reference is None or reference != reference:
+            if source is None or source != source or str(source).strip() == "":
+                source = None
+            else:
+                source = str(source).strip()
+            reference = counter.reference(date, normalize_description(str(description)), round(float(amount), 2), source)
+        hashes.append(expense_hash(date, description, amount, reference))
+    if occurrences is not None and date is not None:
+        occurrences.end_chunk(date)
+    return hashes
+
+
+def _create_base_tables(conn):
+    """Create the tables every schema version starts from"""
+    # Expenses table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            description TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Advice table for storing AI-generated recommendations
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS advice (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Monthly summaries table: per-(month, category) totals kept
+    # current by triggers on expenses
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_summaries (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, category)
+        )
+    """)
+
+
+def _migrate_iso_dates_and_month_index(conn):
+    """Store every expense date as YYYY-MM-DD and index it for range scans"""
+    conn.execute("""
+        UPDATE expenses SET date = date(date)
+        WHERE date(date) IS NOT NULL AND date <> date(date)
+    """)
+    # Covering index: month lookups and category summaries never touch the table
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_expenses_date_category_amount
+        ON expenses (date, category, amount)
+    """)
+
+
+def _migrate_keyset_index(conn):
+    """Index (date, id) so newest-first keyset pagination is an index walk"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date_id ON expenses (date, id)")
+
+
+_REBUILD_MONTHLY_SUMMARIES = (
+    "DELETE FROM monthly_summaries",
+    """
+    INSERT INTO monthly_summaries (month, category, total_amount, count)
+    SELECT substr(date, 1, 7), category, SUM(amount), COUNT(*)
+    FROM expenses
+    GROUP BY substr(date, 1, 7), category
+    """,
+)
+
+
+def _migrate_monthly_summary_triggers(conn):
+    """Materialize per-(month, category) totals and keep them current with triggers"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(monthly_summaries)")]
+    if 'category' not in columns:
+        # The original monthly_summaries layout was never written to
+        conn.execute("DROP TABLE IF EXISTS monthly_summaries")
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS monthly_summaries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
                 month TEXT NOT NULL,
+                category TEXT NOT NULL,
                 total_amount REAL NOT NULL,
-                category_breakdown TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                count INTEGER NOT NULL,
+                PRIMARY KEY (month, category)
             )
         """)
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            INSERT INTO monthly_summaries (month, category, total_amount, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, category) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            UPDATE monthly_summaries
+            SET total_amount = total_amount - OLD.amount, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+            DELETE FROM monthly_summaries
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count <= 0;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_update
+        AFTER UPDATE OF date, amount, category ON expenses
+        BEGIN
+            UPDATE monthly_summaries
+            SET total_amount = total_amount - OLD.amount, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+            DELETE FROM monthly_summaries
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count <= 0;
+            INSERT INTO monthly_summaries (month, category, total_amount, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, category) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                count = count + 1;
+        END
+    """)
+    
+    for statement in _REBUILD_MONTHLY_SUMMARIES:
+        conn.execute(statement)
+
+
+def _migrate_category_cache(conn):
+    """Persist normalized description -> category lookups across sessions"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS category_cache (
+            description_key TEXT PRIMARY KEY,
+            category TEXT NOT NULL,
+            source TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """)
+
+
+def _migrate_content_hash(conn):
+    """Add a unique content hash so re-imported rows are skipped by the database"""
+    conn.execute("ALTER TABLE expenses ADD COLUMN content_hash TEXT")
+    rows = conn.execute("SELECT id, date, description, amount FROM expenses ORDER BY id").fetchall()
+    hashes = _content_hashes((date, description, amount, None, None) for _, date, description, amount in rows)
+    conn.executemany(
+        "UPDATE expenses SET content_hash = ? WHERE id = ?",
+        zip(hashes, (row[0] for row in rows))
+    )
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_content_hash ON expenses (content_hash)")
+
+
+def _migrate_analysis_cache(conn):
+    """Cache monthly analysis results; any change to a month's expenses drops its entries"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            month TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (month, fingerprint)
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_analysis_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            DELETE FROM analysis_cache WHERE month = substr(NEW.date, 1, 7);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_analysis_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            DELETE FROM analysis_cache WHERE month = substr(OLD.date, 1, 7);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_analysis_update
+        AFTER UPDATE ON expenses
+        BEGIN
+            DELETE FROM analysis_cache WHERE month IN (substr(OLD.date, 1, 7), substr(NEW.date, 1, 7));
+        END
+    """)
+
+
+def _migrate_analytics_checkpoint(conn):
+    """Checkpoint tables for the incremental analytics engine"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_daily (
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, category)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+
+
+def _migrate_data_version(conn):
+    """Single-row counter bumped by every write to expenses"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+
+def _migrate_advice_generated_at(conn):
+    """Add generated_at to advice tables from early releases, and index it for recent-advice reads"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(advice)")}
+    if 'generated_at' not in columns:
+        # ALTER TABLE cannot add a CURRENT_TIMESTAMP default; insert_advice sets the value
+        conn.execute("ALTER TABLE advice ADD COLUMN generated_at TIMESTAMP")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_advice_generated_at ON advice (generated_at)")
+
+
+def _migrate_archive_index(conn):
+    """Index of months moved to the Parquet archive, with their row counts and id ranges"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archived_months (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            total_amount REAL NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = (
+    _migrate_iso_dates_and_month_index,
+    _migrate_keyset_index,
+    _migrate_monthly_summary_triggers,
+    _migrate_category_cache,
+    _migrate_content_hash,
+    _migrate_analysis_cache,
+    _migrate_analytics_checkpoint,
+    _migrate_data_version,
+    _migrate_advice_generated_at,
+    _migrate_archive_index,
+)
+
+
+def _json_default(value):
+    """Serialize numpy scalars (and anything else json rejects) in cached results"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class DatabaseManager:
+    """Manages SQLite database operations for BudgetBuddy"""
+    
+    def __init__(self, db_path="database/budgetbuddy.db", archive_dir=None):
+        """
+        Initialize database connection
         
-        conn.commit()
-        conn.close()
+        Args:
+            db_path: Path to the SQLite database file
+            archive_dir: Directory for archived months (default: 'archive' next to the database)
+        """
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._pool = get_pool(db_path)
+        self.archive = ExpenseArchive(archive_dir or os.path.join(os.path.dirname(db_path), "archive"))
+        self._ensure_schema()
     
-    def insert_expense(self, date, description, amount, category):
-        """Insert a single expense record"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _connect(self):
+        """Return the pooled connection for the current thread"""
+        return self._pool.connection()
+    
+    @contextmanager
+    def transaction(self, write=True):
+        """
+        Run a block of statements in a single transaction
         
-        cursor.execute("""
-            INSERT INTO expenses (date, description, amount, category)
-            VALUES (?, ?, ?, ?)
-        """, (date, description, amount, category))
+        Commits on success and rolls back on error. Nested uses join the
+        outermost transaction.
         
-        conn.commit()
-        conn.close()
+        Args:
+            write: Take the write lock up front (BEGIN IMMEDIATE). Under WAL a
+                   deferred transaction that reads and then writes fails with
+                   "database is locked" if another connection commits in
+                   between, without waiting on the busy timeout; pass
+                   write=False only for read-only snapshots.
+        
+        Yields:
+            sqlite3.Connection for the current thread
+        """
+        conn = self._connect()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
     
-    def insert_expenses_batch(self, expenses_df):
-        """Insert multiple expenses from a DataFrame"""
-        conn = sqlite3.connect(self.db_path)
+    def close(self):
+        """Close all pooled connections to this database"""
+        self._pool.close_all()
+    
+    def _ensure_schema(self):
+        """
+        Create or migrate the schema, once per database file per process
+        
+        Later DatabaseManager instances for the same file skip this entirely;
+        the first one only reads PRAGMA user_version when the file is current.
+        """
+        if self._pool.schema_ready:
+            return
+        with self._pool.schema_lock:
+            if self._pool.schema_ready:
+                return
+            conn = self._connect()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < len(MIGRATIONS):
+                with self.transaction() as conn:
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version == 0:
+                        # New file, or one from before migrations were tracked
+                        _create_base_tables(conn)
+                    for migration in MIGRATIONS[version:]:
+                        migration(conn)
+                    conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            self._pool.schema_ready = True
+    
+    def insert_expense(self, date, description, amount, category):
+        """Insert a single expense record"""
+        date = _normalize_date(date)
+        # Manual entries are never duplicates of each other
+        content_hash = expense_hash(date, description, amount, f"manual:{uuid.uuid4()}")
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT INTO expenses (date, description, amount, category, content_hash)
+                VALUES (?, ?, ?, ?, ?)
+            """, (date, description, amount, category, content_hash))
+            self._bump_data_version(conn)
+    
+    def insert_expenses_batch(self, expenses_df, occurrences=None, source=None):
+        """
+        Insert multiple expenses from a DataFrame, skipping rows already stored
         
+        Each row is identified by a hash of its date, normalized description,
+        amount and optional 'reference' column; rows whose hash exists are
+        ignored by the unique index. Without a reference, the n-th identical
+        row of a file is taken to be the n-th identical row already stored
+        from the same source (the 'account' column, else source). Two real
+        identical purchases on the same day in statements of different
+        accounts are therefore stored only once unless their sources differ.
+        
+        Args:
+            expenses_df: DataFrame with date, description, amount and category
+                         columns, and optional 'reference' and 'account' columns
+            occurrences: Optional OccurrenceCounter shared across batches of the same
+                         file, so identical rows are numbered consistently between chunks
+            source: Optional account or card name for rows without an 'account' column
+            
+        Returns:
+            Dictionary with 'inserted' and 'duplicates' row counts
+        """
         # Ensure required columns exist
         required_cols = ['date', 'description', 'amount', 'category']
         for col in required_cols:
@@ -87,86 +642,616 @@ class DatabaseManager:
         expenses_df['amount'] = pd.to_numeric(expenses_df['amount'], errors='coerce')
         expenses_df = expenses_df.dropna(subset=['amount'])
         
-        # Insert into database
-        expenses_df[required_cols].to_sql('expenses', conn, if_exists='append', index=False)
+        references = expenses_df['reference'] if 'reference' in expenses_df.columns else [None] * len(expenses_df)
+        if 'account' in expenses_df.columns:
+            accounts = expenses_df['account'].astype(object)
+            sources = accounts.where(accounts.notna(), source)
+        else:
+            sources = [source] * len(expenses_df)
+        hashes = _content_hashes(
+            zip(expenses_df['date'], expenses_df['description'], expenses_df['amount'], references, sources),
+            occurrences
+        )
         
-        conn.close()
+        candidates = len(hashes)
+        
+        # Rows of archived months are no longer covered by the unique index
+        archived_hashes = self._archived_hashes(set(date[:7] for date in expenses_df['date']))
+        if archived_hashes:
+            fresh = [h not in archived_hashes for h in hashes]
+            expenses_df = expenses_df[fresh]
+            hashes = [h for h, keep in zip(hashes, fresh) if keep]
+        
+        # Insert into database in one transaction; the unique index drops duplicates
+        rows = zip(*(expenses_df[col] for col in required_cols), hashes)
+        with self.transaction() as conn:
+            cursor = conn.executemany("""
+                INSERT OR IGNORE INTO expenses (date, description, amount, category, content_hash)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            inserted = max(cursor.rowcount, 0)
+            if inserted:
+                self._bump_data_version(conn)
+        
+        return {'inserted': inserted, 'duplicates': candidates - inserted}
+    
+    @staticmethod
+    def _bump_data_version(conn):
+        """Advance the data version inside the writing transaction"""
+        conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+    
+    def get_data_version(self):
+        """
+        Get the expenses data version
+        
+        The version increases with every committed insert, from any process,
+        so caches keyed by it are invalidated by the next write.
+        
+        Returns:
+            Integer version
+        """
+        return self._connect().execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0]
+    
+    def _archived_partitions(self, first_month=None, last_month=None):
+        """(month, file name) of archived months in an inclusive YYYY-MM range, oldest first"""
+        return self._connect().execute(
+            "SELECT month, path FROM archived_months WHERE month >= ? AND month <= ? ORDER BY month",
+            (first_month or "", last_month or "9999-99")
+        ).fetchall()
+    
+    def _archived_hashes(self, months):
+        """Content hashes of archived rows in the given YYYY-MM months"""
+        names = [name for month, name in self._archived_partitions() if month in months]
+        if not names:
+            return set()
+        return set(self.archive.read(names, columns=['content_hash'])['content_hash'])
+    
+    def _merge_archived(self, hot, partitions, filters=None, columns=None, order=True):
+        """
+        Combine hot rows from SQLite with matching rows of archived partitions
+        
+        Args:
+            hot: DataFrame read from the expenses table
+            partitions: (month, file name) pairs that may hold matching rows
+            filters: pyarrow row filters equivalent to the SQL WHERE clause
+            columns: Columns selected from SQLite (default: all)
+            order: Sort newest first (date, then id, descending) like the SQL queries
+            
+        Returns:
+            DataFrame with the same columns and dtypes as an all-hot result
+        """
+        if not partitions:
+            return hot
+        cold = self.archive.read([name for _, name in partitions], columns=columns, filters=filters)
+        if cold.empty:
+            return hot
+        cold = cold.reindex(columns=hot.columns)
+        merged = cold if hot.empty else pd.concat([hot, cold], ignore_index=True)
+        if order:
+            merged = merged.sort_values(['date', 'id'], ascending=False, kind='stable', ignore_index=True)
+        return merged
+    
+    def _select_expenses(self, start=None, end=None, end_inclusive=False, category=None):
+        """
+        Expenses in a date range from SQLite and the archive, newest first
+        
+        Only archived months overlapping the range are read.
+        
+        Args:
+            start: Optional first ISO date (inclusive)
+            end: Optional last ISO date, exclusive unless end_inclusive
+            end_inclusive: Treat end as inclusive
+            category: Optional category to filter by
+            
+        Returns:
+            DataFrame of every column of the expenses table
+        """
+        conditions, params, filters = [], [], []
+        if start is not None:
+            conditions.append("date >= ?")
+            params.append(start)
+            filters.append(('date', '>=', start))
+        if end is not None:
+            operator = "<=" if end_inclusive else "<"
+            conditions.append(f"date {operator} ?")
+            params.append(end)
+            filters.append(('date', operator, end))
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+            filters.append(('category', '==', category))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        hot = pd.read_sql_query(
+            f"SELECT * FROM expenses {where} ORDER BY date DESC, id DESC", self._connect(), params=params
+        )
+        partitions = self._archived_partitions(start and start[:7], end and end[:7])
+        return self._merge_archived(hot, partitions, filters or None)
     
     def get_all_expenses(self):
-        """Retrieve all expenses from database"""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM expenses ORDER BY date DESC", conn)
-        conn.close()
-        return df
+        """Retrieve all expenses (hot and archived), newest first"""
+        return self._select_expenses()
+    
+    def get_expenses_page(self, limit=50, after=None):
+        """
+        Get one page of expenses, newest first, using keyset pagination
+        
+        Args:
+            limit: Maximum number of rows to return
+            after: Cursor (date, id) returned by the previous page, or None
+                   for the first page
+            
+        Returns:
+            Tuple of (DataFrame, next_cursor); next_cursor is None on the last page
+        """
+        if after is None:
+            query = "SELECT * FROM expenses ORDER BY date DESC, id DESC LIMIT ?"
+            params = (limit,)
+        else:
+            query = """
+                SELECT * FROM expenses
+                WHERE (date, id) < (?, ?)
+                ORDER BY date DESC, id DESC
+                LIMIT ?
+            """
+            params = (after[0], int(after[1]), limit)
+        
+        df = pd.read_sql_query(query, self._connect(), params=params)
+        
+        # Archived months newest first, until they alone fill the page; older
+        # months cannot hold rows newer than those already collected
+        partitions = self._archived_partitions(last_month=after[0][:7] if after else None)
+        if partitions:
+            filters = None
+            if after is not None:
+                filters = [[('date', '<', after[0])], [('date', '==', after[0]), ('id', '<', int(after[1]))]]
+            needed = []
+            found = 0
+            for month, name in reversed(partitions):
+                needed.append((month, name))
+                found += len(self.archive.read([name], columns=['id'], filters=filters))
+                if found >= limit:
+                    break
+            df = self._merge_archived(df, needed, filters).head(limit)
+        
+        if len(df) < limit:
+            return df, None
+        last = df.iloc[-1]
+        return df, (last['date'], int(last['id']))
+    
+    def iter_expenses(self, chunksize=10000):
+        """
+        Iterate over all expenses, newest first, in fixed-size chunks
+        
+        Only one chunk is held in memory at a time, so arbitrarily large
+        histories can be processed in constant memory.
+        
+        Args:
+            chunksize: Number of rows per chunk
+            
+        Yields:
+            DataFrame chunks of at most chunksize rows
+        """
+        cursor = None
+        while True:
+            chunk, cursor = self.get_expenses_page(chunksize, after=cursor)
+            if not chunk.empty:
+                yield chunk
+            if cursor is None:
+                return
+    
+    def get_recent_expenses(self, limit=10):
+        """Get the most recent expenses, newest first"""
+        return self.get_expenses_page(limit)[0]
+    
+    def get_expense_totals(self):
+        """
+        Get overall spending totals computed in SQL
+        
+        Returns:
+            Dictionary with total_spent, num_transactions and avg_transaction
+        """
+        conn = self._connect()
+        total, count = conn.execute("SELECT COALESCE(SUM(amount), 0), COUNT(*) FROM expenses").fetchone()
+        archived_total, archived_count = conn.execute(
+            "SELECT COALESCE(SUM(total_amount), 0), COALESCE(SUM(rows), 0) FROM archived_months"
+        ).fetchone()
+        total += archived_total
+        count += archived_count
+        return {
+            'total_spent': total,
+            'num_transactions': count,
+            'avg_transaction': total / count if count else 0
+        }
     
     def get_expenses_by_month(self, year, month):
-        """Get expenses for a specific month"""
-        conn = sqlite3.connect(self.db_path)
+        """Get expenses for a specific month (hot or archived), newest first"""
+        return self._select_expenses(*_month_bounds(year, month))
+    
+    def get_expenses_by_months(self, months, columns=None):
+        """
+        Get expenses for several months in one query
         
-        query = """
-            SELECT * FROM expenses 
-            WHERE strftime('%Y', date) = ? AND strftime('%m', date) = ?
-            ORDER BY date DESC
+        Consecutive months are merged into a single date range, so a whole
+        year is one index range scan.
+        
+        Args:
+            months: Iterable of (year, month) pairs
+            columns: Optional list of columns to select (default: all)
+            
+        Returns:
+            DataFrame with the expenses of those months, in no particular order
         """
-        df = pd.read_sql_query(query, conn, params=(str(year), str(month).zfill(2)))
+        bounds = []
+        for start, end in sorted(_month_bounds(year, month) for year, month in set(months)):
+            if bounds and bounds[-1][1] == start:
+                bounds[-1] = (bounds[-1][0], end)
+            else:
+                bounds.append((start, end))
         
-        conn.close()
+        select = ", ".join(columns) if columns else "*"
+        where = " OR ".join(["(date >= ? AND date < ?)"] * len(bounds)) or "0"
+        query = f"SELECT {select} FROM expenses WHERE {where}"
+        hot = pd.read_sql_query(query, self._connect(), params=[value for pair in bounds for value in pair])
+        
+        # Archived partitions hold whole months, so they need no row filter
+        wanted = {f"{int(year):04d}-{int(month):02d}" for year, month in months}
+        partitions = [partition for partition in self._archived_partitions() if partition[0] in wanted]
+        return self._merge_archived(hot, partitions, columns=columns, order=False)
+    
+    def has_expenses(self):
+        """Return True if at least one expense is stored (hot or archived)"""
+        return self._connect().execute(
+            "SELECT EXISTS (SELECT 1 FROM expenses) OR EXISTS (SELECT 1 FROM archived_months)"
+        ).fetchone()[0] == 1
+    
+    def get_expenses_by_date_range(self, start_date, end_date, category=None):
+        """
+        Get expenses between two dates (inclusive), filtered in SQL
+        
+        Args:
+            start_date: First date to include (date, datetime or YYYY-MM-DD)
+            end_date: Last date to include (date, datetime or YYYY-MM-DD)
+            category: Optional category to filter by
+            
+        Returns:
+            DataFrame with a datetime64 'date' column and float 'amount' column
+        """
+        df = self._select_expenses(_normalize_date(start_date), _normalize_date(end_date),
+                                   end_inclusive=True, category=category)
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        df['amount'] = df['amount'].astype('float64')
         return df
     
     def get_category_summary(self, year=None, month=None):
-        """Get spending summary by category"""
-        conn = sqlite3.connect(self.db_path)
+        """Get spending summary by category (read from monthly_summaries)"""
+        conn = self._connect()
         
         if year and month:
             query = """
-                SELECT category, SUM(amount) as total, COUNT(*) as count
-                FROM expenses
-                WHERE strftime('%Y', date) = ? AND strftime('%m', date) = ?
-                GROUP BY category
+                SELECT category, total_amount as total, count
+                FROM monthly_summaries
+                WHERE month = ?
                 ORDER BY total DESC
             """
-            df = pd.read_sql_query(query, conn, params=(str(year), str(month).zfill(2)))
+            df = pd.read_sql_query(query, conn, params=(f"{int(year):04d}-{int(month):02d}",))
         else:
             query = """
-                SELECT category, SUM(amount) as total, COUNT(*) as count
-                FROM expenses
+                SELECT category, SUM(total_amount) as total, SUM(count) as count
+                FROM monthly_summaries
                 GROUP BY category
                 ORDER BY total DESC
             """
             df = pd.read_sql_query(query, conn)
         
-        conn.close()
         return df
     
-    def insert_advice(self, advice_text):
-        """Store AI-generated advice"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def rebuild_monthly_summaries(self):
+        """Regenerate monthly_summaries from scratch out of the expenses table"""
+        with self.transaction() as conn:
+            for statement in _REBUILD_MONTHLY_SUMMARIES:
+                conn.execute(statement)
+            # Summaries read through version-keyed caches must be re-read
+            self._bump_data_version(conn)
+            
+            # Archived rows are no longer in expenses; add their totals back
+            for month, name in self._archived_partitions():
+                rows = self.archive.read([name], columns=['category', 'amount'])
+                totals = rows.groupby('category')['amount'].agg(['sum', 'count'])
+                conn.executemany("""
+                    INSERT INTO monthly_summaries (month, category, total_amount, count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (month, category) DO UPDATE SET
+                        total_amount = total_amount + excluded.total_amount,
+                        count = count + excluded.count
+                """, [(month, category, float(total), int(count)) for category, total, count in totals.itertuples()])
+    
+    def archive_months(self, before=None):
+        """
+        Move every month before a given month from SQLite to the Parquet archive
         
-        cursor.execute("INSERT INTO advice (text) VALUES (?)", (advice_text,))
+        Archived expenses are still returned by every read method; only where
+        they are stored changes, so the data version is left alone. Months
+        that already have a partition are merged with any rows added since.
         
-        conn.commit()
-        conn.close()
+        Args:
+            before: First month to keep hot, as YYYY-MM (default: the current month)
+        
+        Returns:
+            Dictionary of archived month: number of rows moved
+        """
+        before = before or datetime.now().strftime('%Y-%m')
+        months = [row[0] for row in self._connect().execute("""
+            SELECT DISTINCT substr(date, 1, 7) FROM expenses
+            WHERE date < ? AND date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-*'
+            ORDER BY 1
+        """, (f"{before}-01",))]
+        return {month: self._archive_month(month) for month in months}
     
-    def get_recent_advice(self, limit=5):
-        """Retrieve recent advice records"""
-        conn = sqlite3.connect(self.db_path)
+    def _archive_month(self, month):
+        """
+        Write one month's hot rows (plus its existing partition) to a new file
+        and delete them from SQLite
+        
+        The new file is written first; the index switch and the deletes then
+        commit together, and the old file is removed only afterwards.
+        
+        Returns:
+            Number of rows moved out of SQLite
+        """
+        conn = self._connect()
+        year, number = month.split("-")
+        hot = pd.read_sql_query(
+            "SELECT * FROM expenses WHERE date >= ? AND date < ? ORDER BY id",
+            conn, params=_month_bounds(year, number)
+        )
+        previous = conn.execute("SELECT path FROM archived_months WHERE month = ?", (month,)).fetchone()
+        rows = hot
+        if previous:
+            cold = self.archive.read([previous[0]]).reindex(columns=hot.columns)
+            rows = pd.concat([cold, hot], ignore_index=True).sort_values('id', ignore_index=True)
         
+        name = self.archive.write_month(month, rows)
         try:
-            query = f"SELECT * FROM advice ORDER BY generated_at DESC LIMIT {limit}"
-            df = pd.read_sql_query(query, conn)
-        except Exception as e:
-            # Fallback for older database schemas
-            try:
-                query = f"SELECT * FROM advice ORDER BY id DESC LIMIT {limit}"
-                df = pd.read_sql_query(query, conn)
-                # Add generated_at if missing
-                if 'generated_at' not in df.columns:
-                    df['generated_at'] = pd.NaT
-            except:
-                df = pd.DataFrame()
+            with self.transaction() as conn:
+                # Deleting fires the summary and analysis cache triggers, but
+                # the month's expenses have not changed: keep what they hold
+                summaries = conn.execute(
+                    "SELECT month, category, total_amount, count FROM monthly_summaries WHERE month = ?", (month,)
+                ).fetchall()
+                analyses = conn.execute(
+                    "SELECT month, fingerprint, result, created_at FROM analysis_cache WHERE month = ?", (month,)
+                ).fetchall()
+                
+                conn.executemany("DELETE FROM expenses WHERE id = ?", ((int(i),) for i in hot['id']))
+                
+                conn.execute("DELETE FROM monthly_summaries WHERE month = ?", (month,))
+                conn.executemany("INSERT INTO monthly_summaries VALUES (?, ?, ?, ?)", summaries)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_cache (month, fingerprint, result, created_at) VALUES (?, ?, ?, ?)",
+                    analyses
+                )
+                conn.execute("""
+                    INSERT OR REPLACE INTO archived_months (month, path, rows, total_amount, min_id, max_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (month, name, len(rows), float(rows['amount'].sum()),
+                      int(rows['id'].min()), int(rows['id'].max())))
+        except BaseException:
+            self.archive.remove(name)
+            raise
         
-        conn.close()
-        return df
+        if previous:
+            self.archive.remove(previous[0])
+        return len(hot)
+    
+    def get_cached_categories(self, description_keys):
+        """
+        Look up cached categories for normalized descriptions
+        
+        Args:
+            description_keys: Iterable of normalized description keys
+            
+        Returns:
+            Dictionary of description_key: category for the keys that are cached
+        """
+        keys = list(description_keys)
+        conn = self._connect()
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            found.update(conn.execute(
+                f"SELECT description_key, category FROM category_cache WHERE description_key IN ({placeholders})",
+                batch
+            ).fetchall())
+        return found
+    
+    def store_cached_categories(self, categories, source='auto'):
+        """
+        Persist description_key: category pairs in the category cache
+        
+        Args:
+            categories: Dictionary of description_key: category
+            source: 'manual' entries replace existing rows; any other source
+                    only fills keys that are not cached yet
+        """
+        verb = "INSERT OR REPLACE" if source == 'manual' else "INSERT OR IGNORE"
+        with self.transaction() as conn:
+            conn.executemany(
+                f"{verb} INTO category_cache (description_key, category, source) VALUES (?, ?, ?)",
+                ((key, category, source) for key, category in categories.items())
+            )
+    
+    def iter_expense_rows_after(self, last_id, batch_size=50000):
+        """
+        Yield (id, date, category, amount) tuples for expenses with id > last_id
+        
+        Args:
+            last_id: Highest expense id already seen
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Tuples in id order
+        """
+        conn = self._connect()
+        cursor = conn.execute(
+            "SELECT id, date, category, amount FROM expenses WHERE id > ? ORDER BY id",
+            (last_id,)
+        )
+        
+        def hot_rows():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        
+        # Archived months can still hold ids above last_id (e.g. a rebuild from 0)
+        names = [row[0] for row in conn.execute("SELECT path FROM archived_months WHERE max_id > ?", (last_id,))]
+        if not names:
+            yield from hot_rows()
+            return
+        cold = self.archive.read(names, columns=['id', 'date', 'category', 'amount'], filters=[('id', '>', last_id)])
+        cold = cold.sort_values('id')
+        cold_rows = zip(cold['id'].tolist(), cold['date'].tolist(), cold['category'].tolist(), cold['amount'].tolist())
+        yield from heapq.merge(hot_rows(), cold_rows)
+    
+    def get_max_expense_id(self):
+        """Return the highest expense id (hot or archived), or 0 when there are none"""
+        return self._connect().execute(
+            "SELECT MAX(COALESCE((SELECT MAX(id) FROM expenses), 0), COALESCE((SELECT MAX(max_id) FROM archived_months), 0))"
+        ).fetchone()[0]
+    
+    def load_analytics_checkpoint(self):
+        """
+        Load the analytics engine checkpoint
+        
+        Returns:
+            Tuple of (last_id, list of (day, category, total_amount, count))
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM analytics_state WHERE key = 'last_id'").fetchone()
+        cells = conn.execute("SELECT day, category, total_amount, count FROM analytics_daily").fetchall()
+        return (row[0] if row else 0), cells
+    
+    def save_analytics_checkpoint(self, last_id, cells):
+        """
+        Persist changed analytics cells and the id they are current up to
+        
+        Another engine (or process) may have saved a newer checkpoint; its cells
+        already include rows above last_id, so an older one is not written.
+        
+        Args:
+            last_id: Highest expense id folded into the cells
+            cells: Iterable of (day, category, total_amount, count) with absolute values
+            
+        Returns:
+            True if the checkpoint was written, False if a newer one is stored
+        """
+        with self.transaction() as conn:
+            row = conn.execute("SELECT value FROM analytics_state WHERE key = 'last_id'").fetchone()
+            if row and row[0] > last_id:
+                return False
+            conn.executemany("""
+                INSERT OR REPLACE INTO analytics_daily (day, category, total_amount, count)
+                VALUES (?, ?, ?, ?)
+            """, cells)
+            conn.execute(
+                "INSERT OR REPLACE INTO analytics_state (key, value) VALUES ('last_id', ?)",
+                (last_id,)
+            )
+        return True
+    
+    def clear_analytics_checkpoint(self):
+        """Drop the analytics checkpoint so the engine rebuilds from raw rows"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM analytics_daily")
+            conn.execute("DELETE FROM analytics_state")
+    
+    def get_cached_analysis(self, month, fingerprint):
+        """
+        Look up a cached monthly analysis
+        
+        Args:
+            month: Month key in YYYY-MM form
+            fingerprint: Fingerprint of the month's expenses and advisor settings
+            
+        Returns:
+            The cached result dictionary, or None
+        """
+        row = self._connect().execute(
+            "SELECT result FROM analysis_cache WHERE month = ? AND fingerprint = ?",
+            (month, fingerprint)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_cached_analyses(self, keys):
+        """
+        Look up several cached monthly analyses at once
+        
+        Args:
+            keys: Iterable of (month, fingerprint) pairs
+            
+        Returns:
+            Dictionary of (month, fingerprint): result for the keys that are cached
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        where = " OR ".join(["(month = ? AND fingerprint = ?)"] * len(keys))
+        rows = self._connect().execute(
+            f"SELECT month, fingerprint, result FROM analysis_cache WHERE {where}",
+            [value for key in keys for value in key]
+        ).fetchall()
+        return {(month, fingerprint): json.loads(result) for month, fingerprint, result in rows}
+    
+    def store_cached_analysis(self, month, fingerprint, result):
+        """
+        Cache a monthly analysis result until that month's expenses change
+        
+        Args:
+            month: Month key in YYYY-MM form
+            fingerprint: Fingerprint of the month's expenses and advisor settings
+            result: JSON-serializable result dictionary
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (month, fingerprint, result) VALUES (?, ?, ?)",
+                (month, fingerprint, json.dumps(result, default=_json_default))
+            )
+    
+    def insert_advice(self, advice_text):
+        """Store AI-generated advice"""
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO advice (text, generated_at) VALUES (?, CURRENT_TIMESTAMP)", (advice_text,))
+    
+    def get_recent_advice(self, limit=5):
+        """Retrieve the most recent advice records, newest first"""
+        return pd.read_sql_query(
+            "SELECT * FROM advice ORDER BY generated_at DESC, id DESC LIMIT ?",
+            self._connect(), params=(int(limit),)
+        )
 
 
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="BudgetBuddy database maintenance")
+    parser.add_argument("--db", default="database/budgetbuddy.db", help="Path to the SQLite database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-summaries", help="Regenerate monthly_summaries from expenses")
+    archive = commands.add_parser("archive", help="Move closed months to the Parquet archive")
+    archive.add_argument("--before", help="First month to keep in SQLite, as YYYY-MM (default: this month)")
+    archive.add_argument("--vacuum", action="store_true", help="Reclaim the freed space afterwards")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(args.db)
+    if args.command == "rebuild-summaries":
+        db.rebuild_monthly_summaries()
+        print(f"✅ Rebuilt monthly summaries in {args.db}")
+    elif args.command == "archive":
+        moved = db.archive_months(args.before)
+        if args.vacuum:
+            db._connect().execute("VACUUM")
+        print(f"✅ Archived {sum(moved.values())} expenses from {len(moved)} months to {db.archive.root}")
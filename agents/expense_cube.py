@@ -0,0 +1,248 @@
+"""
+Expense Cube for BudgetBuddy AI
+Immutable, typed and pre-aggregated view of a set of expenses, built once and
+shared by the agents that chart and analyze it
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+# Columns that identify an expense's content; the advisor's analysis cache
+# is keyed by hashes of these, whether it is given a DataFrame or a cube
+CONTENT_COLUMNS = ('date', 'description', 'amount', 'category')
+
+# Period grids held by the cube, as numpy datetime units of their start days
+PERIOD_UNITS = {'D': 'D', 'W': 'W', 'M': 'M'}
+
+
+def parse_dates(dates):
+    """Parse a date column without modifying it; ISO strings take the fast path"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    try:
+        return pd.to_datetime(dates, format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(dates)
+
+
+def row_hashes(expenses_df):
+    """Per-row content hashes over CONTENT_COLUMNS, independent of the index"""
+    columns = [col for col in CONTENT_COLUMNS if col in expenses_df.columns]
+    return pd.util.hash_pandas_object(expenses_df[columns], index=False).to_numpy()
+
+
+def week_numbers(day_numbers):
+    """Monday-based week numbers (ISO week boundaries) for days since 1970-01-01"""
+    # 1970-01-01 was a Thursday, so +3 puts boundaries on Mondays
+    return (day_numbers + 3) // 7
+
+
+def _frozen(array):
+    """Mark a numpy array read-only and return it"""
+    array.setflags(write=False)
+    return array
+
+
+class ExpenseCube:
+    """
+    Typed columns and day/week/month x category totals for a set of expenses
+
+    Build one per dataset version and pass it to VisualizerAgent and
+    AdvisorAgent in place of the DataFrame: dates are parsed and amounts
+    aggregated once, however many charts and analyses read the cube.
+
+    Weeks start on Monday (ISO weeks) and months on the 1st. Rows without a
+    category count towards totals but not towards any category; rows without
+    a usable date count towards totals and categories but not towards periods.
+
+    The cube cannot be modified; every accessor returns a new pandas object.
+    """
+
+    def __init__(self, expenses_df):
+        """
+        Build the cube
+
+        Args:
+            expenses_df: DataFrame with 'amount' and optional 'date', 'category'
+                         and 'description' columns (not modified)
+        """
+        num_rows = len(expenses_df)
+        self.has_dates = 'date' in expenses_df.columns
+        self.has_categories = 'category' in expenses_df.columns
+
+        # Typed columns
+        if 'amount' in expenses_df.columns:
+            amounts = expenses_df['amount'].to_numpy(dtype='float64', na_value=0.0)
+        else:
+            amounts = np.zeros(num_rows)
+        self.amounts = _frozen(np.array(amounts, dtype='float64'))
+
+        if self.has_categories:
+            codes, categories = pd.factorize(expenses_df['category'], sort=True)
+        else:
+            codes, categories = np.full(num_rows, -1), []
+        self.categories = tuple(categories)
+        # Category code per row, -1 for rows without a category
+        self.category_codes = _frozen(np.asarray(codes, dtype='int64'))
+
+        if self.has_dates:
+            dates = parse_dates(expenses_df['date']).to_numpy().astype('datetime64[D]')
+        else:
+            dates = np.full(num_rows, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.dates = _frozen(dates)
+
+        # Content hashes, as used by the advisor's analysis cache
+        self.row_hashes = _frozen(row_hashes(expenses_df))
+        self.digest = hashlib.sha1(np.sort(self.row_hashes).tobytes()).hexdigest()
+
+        # Category slot per row; the last slot collects rows without a category
+        num_slots = len(self.categories) + 1
+        slots = np.where(self.category_codes < 0, num_slots - 1, self.category_codes)
+        self._category_sums = _frozen(np.bincount(slots, weights=self.amounts, minlength=num_slots).astype('float64'))
+        self._category_counts = _frozen(np.bincount(slots, minlength=num_slots))
+
+        # Dense day x slot grid from the first to the last dated row
+        valid = ~np.isnat(self.dates)
+        self._grids = {}
+        if valid.any():
+            day_numbers = self.dates[valid].astype('int64')
+            first_day = day_numbers.min()
+            num_days = int(day_numbers.max() - first_day) + 1
+            keys = (day_numbers - first_day) * num_slots + slots[valid]
+            sums = np.bincount(keys, weights=self.amounts[valid], minlength=num_days * num_slots)
+            counts = np.bincount(keys, minlength=num_days * num_slots)
+            days = np.datetime64(int(first_day), 'D') + np.arange(num_days)
+            self._grids['D'] = (days, sums.reshape(num_days, num_slots), counts.reshape(num_days, num_slots))
+
+            # Weeks and months are sums of consecutive days of the day grid
+            for resolution in ('W', 'M'):
+                periods = self._period_starts(days, resolution)
+                starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+                self._grids[resolution] = (
+                    periods[starts],
+                    np.add.reduceat(self._grids['D'][1], starts, axis=0),
+                    np.add.reduceat(self._grids['D'][2], starts, axis=0)
+                )
+            for grid in self._grids.values():
+                for array in grid:
+                    _frozen(array)
+
+        self._sealed = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_sealed', False):
+            raise AttributeError("ExpenseCube is immutable")
+        object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __repr__(self):
+        return f"ExpenseCube({len(self)} expenses, {len(self.categories)} categories, {self.first_date} - {self.last_date})"
+
+    @staticmethod
+    def _period_starts(days, resolution):
+        """First day of the period containing each day"""
+        if resolution == 'W':
+            return (week_numbers(days.astype('int64')) * 7 - 3).astype('datetime64[D]')
+        return days.astype(f'datetime64[{PERIOD_UNITS[resolution]}]').astype('datetime64[D]')
+
+    @property
+    def empty(self):
+        """True if the cube holds no expenses"""
+        return len(self) == 0
+
+    @property
+    def total_spent(self):
+        """Sum of all amounts"""
+        return float(self._category_sums.sum())
+
+    @property
+    def num_transactions(self):
+        """Number of expenses"""
+        return len(self)
+
+    @property
+    def first_date(self):
+        """Earliest expense date as a Timestamp, or None without dates"""
+        return pd.Timestamp(self._grids['D'][0][0]) if self._grids else None
+
+    @property
+    def last_date(self):
+        """Latest expense date as a Timestamp, or None without dates"""
+        return pd.Timestamp(self._grids['D'][0][-1]) if self._grids else None
+
+    @property
+    def day_span(self):
+        """Calendar days from the first to the last expense, 0 without usable dates, None without a date column"""
+        if not self.has_dates:
+            return None
+        return len(self._grids['D'][0]) if self._grids else 0
+
+    def category_totals(self):
+        """
+        Total amount per category
+
+        Returns:
+            Series indexed by category, sorted by category, for categories with expenses
+        """
+        sums = self._category_sums[:-1]
+        present = self._category_counts[:-1] > 0
+        index = pd.Index(np.array(self.categories, dtype=object)[present], name='category')
+        return pd.Series(sums[present], index=index, name='amount')
+
+    def period_totals(self, resolution='D', by_category=False, category=None, dense=None):
+        """
+        Totals per day, week or month
+
+        Args:
+            resolution: 'D', 'W' or 'M'
+            by_category: Return one column per category instead of a single total
+            category: Only count this category
+            dense: Include periods without expenses between the first and last
+                   one with expenses; defaults to False for days, True otherwise
+
+        Returns:
+            Series (DataFrame when by_category) indexed by period start date
+        """
+        if resolution not in PERIOD_UNITS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        if dense is None:
+            dense = resolution != 'D'
+
+        if self._grids:
+            periods, sums, counts = self._grids[resolution]
+        else:
+            periods = np.array([], dtype='datetime64[D]')
+            sums = counts = np.zeros((0, len(self.categories) + 1))
+
+        if category is not None:
+            slot = self.categories.index(category) if category in self.categories else None
+            sums = sums[:, slot] if slot is not None else np.zeros(len(periods))
+            counts = counts[:, slot] if slot is not None else np.zeros(len(periods))
+        elif by_category:
+            sums, counts = sums[:, :-1], counts[:, :-1]
+        else:
+            sums, counts = sums.sum(axis=1), counts.sum(axis=1)
+
+        present = counts > 0 if counts.ndim == 1 else counts.sum(axis=1) > 0
+        if dense:
+            # Trim to the first and last period that has expenses
+            keep = np.zeros(len(periods), dtype=bool)
+            if present.any():
+                positions = np.flatnonzero(present)
+                keep[positions[0]:positions[-1] + 1] = True
+        else:
+            keep = present
+
+        index = pd.DatetimeIndex(periods[keep].astype('datetime64[ns]'), name='date')
+        if by_category and category is None:
+            return pd.DataFrame(sums[keep], index=index, columns=pd.Index(self.categories, name='category'))
+        return pd.Series(sums[keep], index=index, name='amount')
+
+    def daily_totals(self):
+        """Total amount per day that has expenses, in date order"""
+        return self.period_totals('D')
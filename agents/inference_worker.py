@@ -0,0 +1,481 @@
+"""
+Inference Worker for BudgetBuddy AI
+Long-lived local process that owns the Hugging Face models and serves batched
+generation requests from any number of app processes over a local socket
+
+Run it with:
+    python -m agents.inference_worker --warm-up summarization:facebook/bart-large-cnn
+
+Messages are pickled, so only processes holding the per-install key may
+connect: the worker listens on a Unix socket in a private (0700) directory
+and both ends authenticate with a random key kept there in a 0600 file.
+"""
+
+import argparse
+import os
+import queue
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from multiprocessing.connection import Client, Listener, AuthenticationError
+
+from agents.model_registry import model_registry, stream_pipeline, generation_lock
+
+
+RUNTIME_DIR = os.environ.get('BUDGETBUDDY_INFERENCE_DIR',
+                             os.path.join(os.path.expanduser('~'), '.budgetbuddy', 'inference'))
+
+if sys.platform == 'win32':
+    # multiprocessing has no AF_UNIX listener on Windows; named pipes are local-only
+    DEFAULT_ADDRESS = r'\\.\pipe\budgetbuddy-inference'
+else:
+    DEFAULT_ADDRESS = os.path.join(RUNTIME_DIR, 'worker.sock')
+
+# Resolved to the per-install key (see load_authkey) when left as None
+DEFAULT_AUTHKEY = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _runtime_dir():
+    """Create the private directory holding the socket and key"""
+    os.makedirs(RUNTIME_DIR, mode=0o700, exist_ok=True)
+    # makedirs leaves an existing directory's mode alone
+    os.chmod(RUNTIME_DIR, 0o700)
+    return RUNTIME_DIR
+
+
+def load_authkey():
+    """
+    Return the per-install authentication key, creating it on first use
+
+    The key is written to a 0600 temporary file and linked into place, so
+    concurrent first callers all end up reading the same complete key.
+
+    Returns:
+        32 random bytes
+    """
+    path = os.path.join(_runtime_dir(), 'authkey')
+    if not os.path.exists(path):
+        temp_path = f"{path}.{uuid.uuid4().hex}"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temp_path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _batch_key(request):
+    """Requests with equal keys share a pipeline call; kwargs may hold unhashable values"""
+    return request['task'], request['model_name'], repr(sorted(request['kwargs'].items()))
+
+
+def _check_request(request):
+    """Return why a request cannot be served, or None if it is well formed"""
+    if not isinstance(request, dict) or 'id' not in request:
+        return "Malformed request"
+    if request.get('op') == 'stats':
+        return None
+    missing = [field for field in ('task', 'model_name', 'prompt', 'kwargs', 'deadline') if field not in request]
+    if missing:
+        return f"Request is missing {', '.join(missing)}"
+    if not isinstance(request['kwargs'], dict):
+        return "Generation arguments must be a dict"
+    if not isinstance(request['deadline'], (int, float)):
+        return "Deadline must be a number"
+    try:
+        _batch_key(request)
+    except Exception as e:
+        return f"Unusable generation arguments: {e}"
+    return None
+
+
+def _send(conn, send_lock, reply):
+    """Send a reply, ignoring clients that have gone away"""
+    try:
+        with send_lock:
+            conn.send(reply)
+    except OSError:
+        pass
+
+
+def _remove_stale_socket(address):
+    """Delete a Unix socket file left behind by a worker that died"""
+    if sys.platform == 'win32' or not os.path.exists(address):
+        return
+    probe = socket.socket(socket.AF_UNIX)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        os.remove(address)
+    except OSError:
+        pass
+    finally:
+        probe.close()
+
+
+class InferenceError(Exception):
+    """Raised when the worker cannot answer a request"""
+
+
+class InferenceUnavailable(InferenceError):
+    """Raised when no worker is listening at the address"""
+
+
+class InferenceTimeout(InferenceError):
+    """Raised when the worker does not answer before the deadline"""
+
+
+class InferenceWorker:
+    """Serves generation requests, batching prompts that share a model and settings"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY, max_batch=8, batch_wait=0.05):
+        """
+        Initialize the worker
+
+        Args:
+            address: Unix socket path (named pipe on Windows) to listen on
+            authkey: Shared secret clients must present (default: the per-install key)
+            max_batch: Maximum number of prompts passed to a pipeline at once
+            batch_wait: Seconds to wait for more requests after the first one arrives
+        """
+        self.address = address
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self._requests = queue.Queue()
+        # Counters are updated from the batch thread and every stream's thread
+        self._counter_lock = threading.Lock()
+        self.batches = 0
+        self.served = 0
+        self.expired = 0
+
+    def serve_forever(self):
+        """Accept client connections until the process is stopped"""
+        if self.address == DEFAULT_ADDRESS:
+            _runtime_dir()
+        _remove_stale_socket(self.address)
+        # A deep backlog so a burst of sessions connecting at once is not stalled
+        listener = Listener(self.address, backlog=64, authkey=self.authkey)
+        threading.Thread(target=self._batch_loop, name="inference batches", daemon=True).start()
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError):
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+
+    def _handle(self, conn):
+        """Read requests from one client connection until it closes"""
+        send_lock = threading.Lock()
+        try:
+            while True:
+                request = conn.recv()
+                error = _check_request(request)
+                if error:
+                    request_id = request.get('id') if isinstance(request, dict) else None
+                    _send(conn, send_lock, {'id': request_id, 'error': error})
+                elif request.get('op') == 'stats':
+                    _send(conn, send_lock, {'id': request['id'], 'result': self.stats()})
+                elif request.get('op') == 'stream':
+                    # Streams are not batched; they run on this connection's thread
+                    self._stream(request, conn, send_lock)
+                else:
+                    self._requests.put((request, conn, send_lock))
+        except (EOFError, OSError):
+            pass
+
+    def _batch_loop(self):
+        """Collect queued requests into batches and run them one batch at a time"""
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Only prompts for the same model and generation settings share a pipeline call
+            groups = {}
+            for item in batch:
+                groups.setdefault(_batch_key(item[0]), []).append(item)
+            for items in groups.values():
+                # Nothing a request carries may stop the loop every later request waits on
+                try:
+                    self._run_batch(items)
+                except Exception as e:
+                    for request, conn, send_lock in items:
+                        _send(conn, send_lock, {'id': request['id'], 'error': str(e)})
+
+    def _run_batch(self, items):
+        """Run one pipeline call for a group of requests and send each reply"""
+        now = time.time()
+        live = []
+        for item in items:
+            if item[0]['deadline'] < now:
+                # The client has already given up and fallen back
+                with self._counter_lock:
+                    self.expired += 1
+            else:
+                live.append(item)
+        if not live:
+            return
+
+        first = live[0][0]
+        prompts = [request['prompt'] for request, _, _ in live]
+        try:
+            pipe = model_registry.get(first['task'], first['model_name'])
+            # Streams on connection threads share this pipeline
+            with generation_lock(pipe):
+                outputs = pipe(prompts, batch_size=len(prompts), **first['kwargs'])
+            # Match the shape of a single-prompt call: a list of result dicts
+            replies = [{'id': request['id'], 'result': output if isinstance(output, list) else [output]}
+                       for (request, _, _), output in zip(live, outputs)]
+        except Exception as e:
+            replies = [{'id': request['id'], 'error': str(e)} for request, _, _ in live]
+
+        with self._counter_lock:
+            self.batches += 1
+            self.served += len(live)
+        for reply, (_, conn, send_lock) in zip(replies, live):
+            _send(conn, send_lock, reply)
+
+    def _stream(self, request, conn, send_lock):
+        """Send generated text for one request as it is produced, then a done marker"""
+        request_id = request['id']
+        # Deadlines travel as wall-clock times; generation measures monotonic time
+        deadline = time.monotonic() + (request['deadline'] - time.time())
+        try:
+            pipe = model_registry.get(request['task'], request['model_name'])
+            for text in stream_pipeline(pipe, request['prompt'], deadline=deadline, **request['kwargs']):
+                with send_lock:
+                    conn.send({'id': request_id, 'text': text})
+            reply = {'id': request_id, 'done': True}
+        except TimeoutError as e:
+            # Caught before OSError, its base class, so the client hears about it
+            reply = {'id': request_id, 'error': str(e)}
+        except OSError:
+            # Client went away; leaving the loop stops generation
+            return
+        except Exception as e:
+            reply = {'id': request_id, 'error': str(e)}
+        with self._counter_lock:
+            self.served += 1
+        _send(conn, send_lock, reply)
+
+    def stats(self):
+        """Return request counters and the models loaded in this worker"""
+        with self._counter_lock:
+            counters = {'batches': self.batches, 'served': self.served, 'expired': self.expired}
+        return {
+            **counters,
+            'queued': self._requests.qsize(),
+            'models': model_registry.stats()
+        }
+
+
+def start_worker(address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY, warm_up=()):
+    """
+    Launch a detached worker process
+
+    If another worker already owns the address, the new one exits on its own.
+
+    Args:
+        address: Unix socket path (named pipe on Windows) for the worker to listen on
+        authkey: Shared secret clients must present (default: the per-install key)
+        warm_up: (task, model_name) pairs to load as soon as the worker starts
+
+    Returns:
+        subprocess.Popen for the worker
+    """
+    command = [sys.executable, '-m', 'agents.inference_worker', '--address', address]
+    for task, model_name in warm_up:
+        command += ['--warm-up', f"{task}:{model_name}"]
+    env = dict(os.environ)
+    if authkey is not None:
+        # The environment of a process is only readable by its owner
+        env['BUDGETBUDDY_INFERENCE_AUTHKEY'] = authkey.hex()
+    return subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class InferenceClient:
+    """Sends generation requests to the inference worker"""
+
+    _start_lock = threading.Lock()
+    _started = set()
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY, timeout=10.0,
+                 autostart=False, warm_up=()):
+        """
+        Initialize the client
+
+        Args:
+            address: Unix socket path (named pipe on Windows) of the worker
+            authkey: Shared secret of the worker (default: the per-install key)
+            timeout: Default seconds to wait for a reply
+            autostart: Launch a worker if none is listening; the request that
+                       triggers the launch still fails fast so callers can fall back
+            warm_up: (task, model_name) pairs an autostarted worker loads immediately
+        """
+        self.address = address
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.timeout = timeout
+        self.autostart = autostart
+        self.warm_up = tuple(warm_up)
+
+    def _connect(self):
+        """Open a connection to the worker, launching one if configured to"""
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            if self.autostart:
+                with self._start_lock:
+                    # One launch per address per process; later failures just fall back
+                    if self.address not in self._started:
+                        self._started.add(self.address)
+                        start_worker(self.address, self.authkey, self.warm_up)
+            raise InferenceUnavailable(f"No inference worker at {self.address}: {e}") from e
+
+    def _request(self, message, timeout):
+        """Send one request and wait up to timeout seconds for its reply"""
+        conn = self._connect()
+        try:
+            conn.send(message)
+            if not conn.poll(timeout):
+                raise InferenceTimeout(f"Inference worker did not answer within {timeout:.1f}s")
+            reply = conn.recv()
+        except (EOFError, OSError) as e:
+            raise InferenceUnavailable(f"Lost connection to inference worker: {e}") from e
+        finally:
+            conn.close()
+
+        if 'error' in reply:
+            raise InferenceError(reply['error'])
+        return reply['result']
+
+    def generate(self, task, model_name, prompt, timeout=None, **kwargs):
+        """
+        Run a prompt through a model owned by the worker
+
+        Args:
+            task: Hugging Face pipeline task
+            model_name: Hugging Face model name
+            prompt: Input text
+            timeout: Seconds to wait; defaults to the client's timeout
+            **kwargs: Generation arguments passed to the pipeline
+
+        Returns:
+            Pipeline output for the prompt, e.g. [{'summary_text': ...}]
+
+        Raises:
+            InferenceError: If the worker is unavailable, too slow or fails
+        """
+        timeout = self.timeout if timeout is None else timeout
+        return self._request({
+            'op': 'generate',
+            'id': uuid.uuid4().hex,
+            'task': task,
+            'model_name': model_name,
+            'prompt': prompt,
+            'kwargs': kwargs,
+            'deadline': time.time() + timeout
+        }, timeout)
+
+    def stream(self, task, model_name, prompt, timeout=None, **kwargs):
+        """
+        Run a prompt through a model owned by the worker, yielding text as it is generated
+
+        Args:
+            task: Hugging Face pipeline task
+            model_name: Hugging Face model name
+            prompt: Input text
+            timeout: Seconds allowed for the whole generation; defaults to the client's timeout
+            **kwargs: Generation arguments passed to the pipeline
+
+        Yields:
+            Decoded text fragments
+
+        Raises:
+            InferenceError: If the worker is unavailable, stalls past the timeout or fails
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        conn = self._connect()
+        try:
+            conn.send({
+                'op': 'stream',
+                'id': uuid.uuid4().hex,
+                'task': task,
+                'model_name': model_name,
+                'prompt': prompt,
+                'kwargs': kwargs,
+                'deadline': time.time() + timeout
+            })
+            while True:
+                if not conn.poll(max(deadline - time.monotonic(), 0)):
+                    raise InferenceTimeout(f"Inference worker stalled past {timeout:.1f}s")
+                reply = conn.recv()
+                if 'error' in reply:
+                    raise InferenceError(reply['error'])
+                if reply.get('done'):
+                    break
+                yield reply['text']
+        except (EOFError, OSError) as e:
+            raise InferenceUnavailable(f"Lost connection to inference worker: {e}") from e
+        finally:
+            # Closing the connection also tells the worker to stop generating
+            conn.close()
+
+    def stats(self, timeout=None):
+        """Return the worker's counters and loaded models"""
+        timeout = self.timeout if timeout is None else timeout
+        return self._request({'op': 'stats', 'id': uuid.uuid4().hex}, timeout)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="BudgetBuddy AI inference worker")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Unix socket path (named pipe on Windows)")
+    parser.add_argument("--max-batch", type=int, default=8, help="Maximum prompts per pipeline call")
+    parser.add_argument("--batch-wait", type=float, default=0.05,
+                        help="Seconds to wait for more requests before running a batch")
+    parser.add_argument("--warm-up", action="append", default=[], metavar="TASK:MODEL",
+                        help="Load a model at startup (repeatable)")
+    args = parser.parse_args()
+
+    for spec in args.warm_up:
+        task, model_name = spec.split(":", 1)
+        model_registry.warm_up(task, model_name)
+
+    authkey = os.environ.get('BUDGETBUDDY_INFERENCE_AUTHKEY')
+    worker = InferenceWorker(args.address, authkey=bytes.fromhex(authkey) if authkey else None,
+                             max_batch=args.max_batch, batch_wait=args.batch_wait)
+    print(f"🚀 Inference worker listening on {args.address}")
+    try:
+        worker.serve_forever()
+    except OSError as e:
+        # Typically another worker already owns the port
+        print(f"❌ Could not start inference worker: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Model Registry for BudgetBuddy AI
+Loads Hugging Face pipelines on first use and shares them across the process
+"""
+
+import queue
+import threading
+import time
+import weakref
+
+
+class ModelRegistry:
+    """Process-wide cache of lazily loaded Hugging Face pipelines"""
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._pipelines = {}
+        self._stats = {}
+        self._errors = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        """Lock serializing loads of one (task, model) pair"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, task, model_name):
+        """
+        Return the shared pipeline for a task and model, loading it if needed
+
+        Concurrent callers asking for a model that is still loading wait for
+        that load instead of starting their own.
+
+        Args:
+            task: Hugging Face pipeline task, e.g. "summarization"
+            model_name: Hugging Face model name
+
+        Returns:
+            transformers Pipeline
+
+        Raises:
+            ImportError: If transformers (or its backend) is not installed
+            RuntimeError: If an earlier attempt to load this model failed
+        """
+        key = (task, model_name)
+        pipe = self._pipelines.get(key)
+        if pipe is not None:
+            return pipe
+
+        with self._key_lock(key):
+            pipe = self._pipelines.get(key)
+            if pipe is None:
+                if key in self._errors:
+                    # Don't pay for a failing download/import on every request
+                    raise RuntimeError(f"Loading {model_name} failed earlier: {self._errors[key]}")
+
+                start = time.perf_counter()
+                try:
+                    # Heavy import deferred until a model is actually needed
+                    from transformers import pipeline
+                    pipe = pipeline(task, model=model_name)
+                except Exception as e:
+                    self._errors[key] = str(e)
+                    self._stats[key] = {'task': task, 'model_name': model_name, 'error': str(e)}
+                    raise
+                self._stats[key] = {
+                    'task': task,
+                    'model_name': model_name,
+                    'load_seconds': time.perf_counter() - start,
+                    'memory_bytes': self._memory_footprint(pipe),
+                    'loaded_at': time.time()
+                }
+                self._pipelines[key] = pipe
+        return pipe
+
+    def warm_up(self, task, model_name, background=True):
+        """
+        Load a pipeline ahead of the first request
+
+        Args:
+            task: Hugging Face pipeline task
+            model_name: Hugging Face model name
+            background: If True, load on a daemon thread and return immediately
+
+        Returns:
+            The loading thread when background is True, otherwise the pipeline
+        """
+        if not background:
+            return self.get(task, model_name)
+
+        def load():
+            try:
+                self.get(task, model_name)
+            except Exception:
+                # Recorded in stats(); requests fall back to rule-based advice
+                pass
+
+        thread = threading.Thread(target=load, name=f"warm-up {model_name}", daemon=True)
+        thread.start()
+        return thread
+
+    def reset_error(self, task, model_name):
+        """Forget a failed load so the next request tries again"""
+        self._errors.pop((task, model_name), None)
+
+    def is_loaded(self, task, model_name):
+        """Return True if the pipeline is already in memory"""
+        return (task, model_name) in self._pipelines
+
+    def stats(self):
+        """
+        Return load statistics for every model requested so far
+
+        Returns:
+            List of dictionaries with task, model_name, load_seconds,
+            memory_bytes and loaded_at (or error if loading failed)
+        """
+        with self._lock:
+            return [dict(entry) for entry in self._stats.values()]
+
+    @staticmethod
+    def _memory_footprint(pipe):
+        """Bytes held by the model's parameters and buffers, if it exposes them"""
+        model = getattr(pipe, 'model', None)
+        if model is None:
+            return None
+        if hasattr(model, 'get_memory_footprint'):
+            return model.get_memory_footprint()
+        if hasattr(model, 'parameters'):
+            return sum(p.numel() * p.element_size() for p in model.parameters())
+        return None
+
+
+_generation_locks = weakref.WeakKeyDictionary()
+_generation_locks_lock = threading.Lock()
+
+
+def generation_lock(pipe):
+    """
+    Lock to hold while a pipeline generates
+
+    Pipelines and fast tokenizers are not thread-safe, and one pipeline is
+    shared by every caller in the process, so generation on it is serialized.
+
+    Args:
+        pipe: Loaded pipeline
+
+    Returns:
+        threading.Lock shared by every caller using this pipeline
+    """
+    with _generation_locks_lock:
+        lock = _generation_locks.get(pipe)
+        if lock is None:
+            lock = _generation_locks[pipe] = threading.Lock()
+        return lock
+
+
+def stream_pipeline(pipe, prompt, deadline=None, **generation_kwargs):
+    """
+    Run a text pipeline on a background thread and yield text as it is generated
+
+    Closing the returned generator stops generation at the next token.
+    Generation holds the pipeline's generation_lock, so concurrent streams and
+    batched calls take turns; time spent waiting counts against the deadline.
+
+    Args:
+        pipe: Loaded summarization or text2text-generation pipeline
+        prompt: Input text
+        deadline: Optional time.monotonic() value after which to give up
+        **generation_kwargs: Generation arguments passed to the pipeline
+
+    Yields:
+        Decoded text fragments, prompt excluded
+
+    Raises:
+        TimeoutError: If the deadline passes before generation finishes
+    """
+    from transformers import TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
+
+    stop = threading.Event()
+
+    class StopOnEvent(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return stop.is_set()
+
+    streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def generate():
+        try:
+            with generation_lock(pipe):
+                # The consumer may have given up while this waited for its turn
+                if stop.is_set():
+                    return
+                pipe(prompt, streamer=streamer, stopping_criteria=StoppingCriteriaList([StopOnEvent()]),
+                     **generation_kwargs)
+        except Exception as e:
+            errors.append(e)
+            # Wake the consumer up instead of leaving it waiting for the deadline
+            streamer.end()
+
+    threading.Thread(target=generate, name="stream generation", daemon=True).start()
+    try:
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("Generation did not finish before the deadline")
+            try:
+                text = streamer.text_queue.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("Generation stalled past the deadline")
+            if text is streamer.stop_signal:
+                break
+            if text:
+                yield text
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+
+
+model_registry = ModelRegistry()
@@ -5,34 +5,78 @@ Handles expense input from manual entry or CSV files and stores in database
 
 import pandas as pd
 import io
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from agents.database import DatabaseManager
+from agents.database import DatabaseManager, OccurrenceCounter
+from agents.categorizer import default_categorizer, CategoryCache
+from agents.analytics import AnalyticsEngine
 
 
-def categorize_auto(df):
-    """Auto-categorize expenses based on description keywords"""
-    keywords = {
-        "Food": ["restaurant", "groceries", "meal", "snack", "food", "cafe", "coffee", "starbucks", "dining", "lunch", "dinner"],
-        "Transport": ["uber", "bus", "train", "fuel", "taxi", "metro", "flight", "transport", "travel", "ride"],
-        "Entertainment": ["movie", "game", "netflix", "cinema", "theater", "entertainment", "spotify", "music"],
-        "Utilities": ["electricity", "water", "gas", "wifi", "internet", "mobile", "phone", "utility", "bill"],
-        "Shopping": ["amazon", "flipkart", "shopping", "mall", "store", "purchase", "buy", "order"],
-        "Health": ["medical", "pharmacy", "hospital", "doctor", "medicine", "health", "clinic"],
-        "Education": ["school", "tuition", "course", "education", "university", "book", "study"],
-        "Bills": ["electricity", "water", "rent", "insurance", "loan", "emi", "bill"],
-        "Savings": ["bank", "deposit", "investment", "sip", "mutual"]
-    }
+def categorize_auto(df, cache=None):
+    """
+    Auto-categorize expenses based on description keywords
     
-    for key, words in keywords.items():
-        df.loc[df['description'].str.lower().str.contains('|'.join(words), na=False), 'category'] = key
+    Args:
+        df: DataFrame with a description column; category is updated in place
+        cache: Optional CategoryCache consulted before keyword matching
+    """
+    if cache is not None:
+        matched = cache.lookup(df['description'])
+    else:
+        matched = default_categorizer.categorize_series(df['description'])
+    found = matched.notna().values
+    df.loc[found, 'category'] = matched.values[found]
+
+
+def _ingest_payload(file_input):
+    """Turn an uploaded file, path or bytes into something a worker process can receive"""
+    if isinstance(file_input, (bytes, str, os.PathLike)):
+        return file_input
+    if hasattr(file_input, 'getvalue'):
+        return file_input.getvalue()
+    return file_input.read()
+
+
+def _parse_for_ingest(job):
+    """
+    Worker entry point for TrackerAgent.ingest_files
+    
+    Args:
+        job: Tuple of (name, payload) where payload is bytes or a path
+        
+    Returns:
+        Tuple of (name, DataFrame or None, needs_category, error message or None)
+    """
+    name, payload = job
+    try:
+        detected = {}
+        df = TrackerAgent._normalize_expenses(TrackerAgent._read_csv(payload), detected, categorize=False)
+        return name, df, detected.get('needs_category', False), None
+    except Exception as e:
+        return name, None, False, str(e)
+
+
+# forkserver children start from a clean process rather than a fork of the
+# (multi-threaded) Streamlit server
+_INGEST_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
 
 
 class TrackerAgent:
     """Agent responsible for tracking and storing user expenses"""
     
-    def __init__(self):
-        """Initialize the tracker agent with database connection"""
-        self.db = DatabaseManager()
+    def __init__(self, db=None, analytics=None):
+        """
+        Initialize the tracker agent with database connection
+        
+        Args:
+            db: Optional DatabaseManager to use instead of the default database
+            analytics: Optional AnalyticsEngine to keep current; one is created for db by default
+        """
+        self.db = db if db is not None else DatabaseManager()
+        self.category_cache = CategoryCache(self.db)
+        self.analytics = analytics if analytics is not None else AnalyticsEngine(self.db)
     
     def parse_csv_expenses(self, file_input):
         """
@@ -44,16 +88,59 @@ class TrackerAgent:
         Returns:
             DataFrame with standardized expense data
         """
+        df = self._read_csv(file_input)
+        return self._normalize_expenses(df, category_cache=self.category_cache)
+    
+    def iter_csv_expenses(self, file_input, chunksize=50000):
+        """
+        Parse expenses from a CSV file in fixed-size chunks
+        
+        Column detection is decided on the first chunk and reused for the
+        rest, so every chunk comes out with the same standardized columns.
+        
+        Args:
+            file_input: File object or file path
+            chunksize: Number of CSV rows per chunk
+            
+        Yields:
+            DataFrames with standardized expense data
+        """
+        detected = {}
+        for chunk in self._read_csv(file_input, chunksize=chunksize):
+            yield self._normalize_expenses(chunk, detected, self.category_cache)
+    
+    @staticmethod
+    def _read_csv(file_input, **kwargs):
+        """Read a CSV from bytes, a file object or a path"""
         try:
             # Handle different input types
             if isinstance(file_input, bytes):
-                df = pd.read_csv(io.BytesIO(file_input))
+                return pd.read_csv(io.BytesIO(file_input), **kwargs)
             elif hasattr(file_input, 'read'):
-                df = pd.read_csv(file_input)
+                return pd.read_csv(file_input, **kwargs)
             else:
-                df = pd.read_csv(file_input)
+                return pd.read_csv(file_input, **kwargs)
         except Exception as e:
             raise ValueError(f"Error reading CSV file: {str(e)}")
+    
+    @staticmethod
+    def _normalize_expenses(df, detected=None, category_cache=None, categorize=True):
+        """
+        Map columns, clean amounts, categorize and normalize dates
+        
+        Args:
+            df: Raw DataFrame read from a CSV
+            detected: Optional dict remembering fallback column choices across
+                      chunks of the same file; filled in on first use
+            category_cache: Optional CategoryCache used for auto-categorization
+            categorize: If False, rows without a category are left as
+                        'Uncategorized' and detected['needs_category'] is set
+            
+        Returns:
+            DataFrame with standardized expense data
+        """
+        if detected is None:
+            detected = {}
         
         # Normalize column names (case-insensitive)
         df.columns = [c.strip().lower() for c in df.columns]
@@ -73,7 +160,11 @@ class TrackerAgent:
             'classification': 'category',
             # Date variations
             'date': 'date', 'timestamp': 'date', 'time': 'date', 'dt': 'date',
-            'transaction_date': 'date', 'transaction_dt': 'date'
+            'transaction_date': 'date', 'transaction_dt': 'date',
+            # Optional source reference used to tell identical rows apart
+            'ref': 'reference', 'transaction_id': 'reference', 'txn_id': 'reference',
+            # Optional account, so identical purchases on two cards are both kept
+            'account_name': 'account', 'account_number': 'account', 'card': 'account'
         }
         
         # Rename columns
@@ -84,10 +175,12 @@ class TrackerAgent:
         # Validate required columns - be flexible
         if 'amount' not in df.columns:
             # Try to find any numeric column as amount
-            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-            if len(numeric_cols) > 0:
+            if 'amount' not in detected:
+                numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+                detected['amount'] = numeric_cols[0] if len(numeric_cols) > 0 else None
+            if detected['amount'] is not None:
                 # Use first numeric column as amount
-                df = df.rename(columns={numeric_cols[0]: 'amount'})
+                df = df.rename(columns={detected['amount']: 'amount'})
             else:
                 raise ValueError(
                     "CSV must contain at least one numeric column for amount. "
@@ -105,16 +198,20 @@ class TrackerAgent:
         # Add default values for missing columns
         if 'description' not in df.columns:
             # Use first text column as description
-            text_cols = df.select_dtypes(include=['object']).columns
-            if len(text_cols) > 0 and text_cols[0] != 'date':
-                df = df.rename(columns={text_cols[0]: 'description'})
+            if 'description' not in detected:
+                text_cols = df.select_dtypes(include=['object']).columns
+                detected['description'] = text_cols[0] if len(text_cols) > 0 and text_cols[0] != 'date' else None
+            if detected['description'] is not None:
+                df = df.rename(columns={detected['description']: 'description'})
             else:
                 df['description'] = 'No description'
         
         if 'category' not in df.columns:
             # Auto-categorize based on description keywords
             df['category'] = 'Uncategorized'
-            categorize_auto(df)
+            detected['needs_category'] = True
+            if categorize:
+                categorize_auto(df, category_cache)
         
         if 'date' not in df.columns:
             df['date'] = datetime.now().strftime('%Y-%m-%d')
@@ -127,21 +224,25 @@ class TrackerAgent:
         
         return df
     
-    def store_expenses(self, expenses_df):
+    def store_expenses(self, expenses_df, occurrences=None, source=None):
         """
-        Store expenses in the database
+        Store expenses in the database, skipping rows that are already stored
         
         Args:
             expenses_df: DataFrame with expense data
+            occurrences: Optional OccurrenceCounter shared across chunks of the same file
+            source: Optional account or card name, for files without an account column
             
         Returns:
-            Number of records stored
+            Dictionary with 'inserted' (new) and 'duplicates' (skipped) counts
         """
         if expenses_df.empty:
-            return 0
+            return {'inserted': 0, 'duplicates': 0}
         
-        self.db.insert_expenses_batch(expenses_df)
-        return len(expenses_df)
+        result = self.db.insert_expenses_batch(expenses_df, occurrences, source)
+        # Fold only the newly stored rows into the running aggregates
+        self.analytics.sync()
+        return result
     
     def add_manual_expense(self, date, description, amount, category):
         """
@@ -157,6 +258,9 @@ class TrackerAgent:
             True if successful
         """
         self.db.insert_expense(date, description, amount, category)
+        self.analytics.sync()
+        if category != 'Uncategorized':
+            self.category_cache.remember(description, category)
         return True
     
     def get_all_expenses(self):
@@ -181,16 +285,108 @@ class TrackerAgent:
         
         return self.db.get_expenses_by_month(year, month)
     
-    def process_and_store_csv(self, file_input):
+    def process_and_store_csv(self, file_input, source=None):
         """
         Process CSV file and store expenses in one step
         
         Args:
             file_input: File object or file path
+            source: Optional account or card name, for files without an account column
             
         Returns:
-            Tuple of (DataFrame, number_of_records_stored)
+            Tuple of (DataFrame, number_of_new_records_stored)
         """
         df = self.parse_csv_expenses(file_input)
-        count = self.store_expenses(df)
-        return df, count
+        result = self.store_expenses(df, source=source)
+        return df, result['inserted']
+    
+    def process_and_store_csv_streaming(self, file_input, chunksize=50000, progress_callback=None, source=None):
+        """
+        Process and store a CSV file chunk by chunk
+        
+        Each chunk is parsed, categorized and written in its own transaction,
+        so peak memory depends on chunksize rather than on the file size.
+        Rows without a reference column are numbered as in a whole-file import
+        when the file is sorted by date (see OccurrenceCounter).
+        
+        Args:
+            file_input: File object or file path
+            chunksize: Number of CSV rows per chunk
+            progress_callback: Optional callable(chunk_number, chunk_inserted, total_inserted)
+                               invoked after each chunk is stored
+            source: Optional account or card name, for files without an account column
+            
+        Returns:
+            Dictionary with 'inserted' (new) and 'duplicates' (skipped) counts
+        """
+        totals = {'inserted': 0, 'duplicates': 0}
+        occurrences = OccurrenceCounter()
+        for number, chunk in enumerate(self.iter_csv_expenses(file_input, chunksize), 1):
+            result = self.store_expenses(chunk, occurrences, source)
+            totals['inserted'] += result['inserted']
+            totals['duplicates'] += result['duplicates']
+            if progress_callback is not None:
+                progress_callback(number, result['inserted'], totals['inserted'])
+        return totals
+    
+    def ingest_files(self, files, max_workers=None, source=None):
+        """
+        Parse many CSV files in parallel and store them in one bulk write
+        
+        Files are read and normalized on a process pool. Rows that need
+        auto-categorization are then categorized together through the
+        category cache, and everything is inserted in a single transaction.
+        
+        Args:
+            files: Iterable of file objects, paths or bytes
+            max_workers: Maximum worker processes (defaults to CPU count)
+            source: Optional account or card name, for files without an account column
+            
+        Returns:
+            List of dictionaries per file with 'name', 'count' (rows parsed),
+            'inserted', 'duplicates' and 'error'
+        """
+        jobs = []
+        for number, file_input in enumerate(files, 1):
+            name = getattr(file_input, 'name', None) or (
+                str(file_input) if isinstance(file_input, (str, os.PathLike)) else f"file {number}"
+            )
+            jobs.append((name, _ingest_payload(file_input)))
+        
+        if len(jobs) > 1:
+            workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+            context = multiprocessing.get_context(_INGEST_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = list(pool.map(_parse_for_ingest, jobs))
+        else:
+            results = [_parse_for_ingest(job) for job in jobs]
+        
+        report = []
+        frames = []
+        needs_category = []
+        for name, df, auto, error in results:
+            count = 0 if df is None else len(df)
+            report.append({'name': name, 'count': count, 'inserted': 0, 'duplicates': 0, 'error': error})
+            if count:
+                frames.append((report[-1], df))
+                needs_category.append(pd.Series(auto, index=range(count)))
+        
+        if frames:
+            merged = pd.concat([df for _, df in frames], ignore_index=True)
+            mask = pd.concat(needs_category, ignore_index=True).values
+            if mask.any():
+                subset = merged.loc[mask, ['description', 'category']].copy()
+                categorize_auto(subset, self.category_cache)
+                merged.loc[mask, 'category'] = subset['category'].values
+            
+            # One transaction for every file; per-file inserts keep per-file counts
+            with self.db.transaction():
+                offset = 0
+                for item, df in frames:
+                    result = self.db.insert_expenses_batch(merged.iloc[offset:offset + len(df)], source=source)
+                    item.update(result)
+                    offset += len(df)
+            # After commit, so a rolled-back ingest never reaches the aggregates
+            self.analytics.sync()
+        
+        return report
@@ -3,26 +3,249 @@ Visualizer Agent for BudgetBuddy AI
 Creates charts and visualizations for expense analysis using Matplotlib
 """
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import hashlib
+import os
+import threading
 import io
+from agents.expense_cube import ExpenseCube
+
+
+# render_chart kinds and the create_* method that draws each
+CHART_KINDS = {
+    'pie': 'create_category_pie_chart',
+    'bar': 'create_category_bar_chart',
+    'time_series': 'create_time_series_chart',
+    'daily': 'create_daily_spending_chart',
+    'trend': 'create_trend_analysis'
+}
+
+# Dashboard charts, the aggregate each one is drawn from and its drawing method
+DASHBOARD_CHARTS = {
+    'pie': ('category_totals', '_plot_category_pie'),
+    'bar': ('category_totals', '_plot_category_bar'),
+    'time_series': ('daily_totals', '_plot_time_series'),
+    'daily': ('daily_totals', '_plot_daily_spending')
+}
+
+# Time resolutions for date charts, finest first:
+# resolution -> (pandas resample rule, days per point, label, date format)
+RESOLUTIONS = {
+    'D': ('D', 1, 'Daily', '%Y-%m-%d'),
+    'W': ('W-MON', 7, 'Weekly', '%Y-%m-%d'),
+    'M': ('MS', 30.4, 'Monthly', '%Y-%m')
+}
+
+# Horizontal pixels each point (or bar) should get before switching to a coarser resolution
+MIN_POINT_PIXELS = 4
+
+# Lines with more points than this are drawn without markers
+MARKER_LIMIT = 100
+
+
+def choose_resolution(first_date, last_date, width_px):
+    """
+    Pick the finest resolution whose points fit across a plot
+    
+    Args:
+        first_date: Earliest date plotted (Timestamp)
+        last_date: Latest date plotted (Timestamp)
+        width_px: Width of the plot area in pixels
+        
+    Returns:
+        'D', 'W' or 'M'
+    """
+    days = (last_date - first_date).days + 1
+    for resolution in ('D', 'W'):
+        if days / RESOLUTIONS[resolution][1] * MIN_POINT_PIXELS <= width_px:
+            return resolution
+    return 'M'
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+    
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    point kept before it and the mean of the next bucket. Peaks and troughs
+    survive, so the line keeps its visible shape.
+    
+    Args:
+        x: Increasing x values (numeric array)
+        y: y values
+        threshold: Number of points to keep
+        
+    Returns:
+        Sorted array of indices into x and y
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    # Bucket boundaries over the interior points, plus the last point as the final "next bucket"
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(int), n)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_x = x[end:edges[i + 2]].mean()
+        next_y = y[end:edges[i + 2]].mean()
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+# Agent used by render pool worker processes, created by _init_render_worker
+_worker_agent = None
+
+
+def _init_render_worker(figsize, style, dpi, max_points):
+    """Set up a render pool process: headless backend and a matching agent"""
+    global _worker_agent
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_agent = VisualizerAgent(figsize=figsize, style=style, dpi=dpi, render_workers=0,
+                                    max_points=max_points)
+    # Pay for the pyplot import now rather than on the first chart
+    _worker_agent._pyplot()
+
+
+def _render_dashboard_chart(kind, totals, fmt):
+    """Draw one dashboard chart from its aggregate inside a render pool process"""
+    plot = getattr(_worker_agent, DASHBOARD_CHARTS[kind][1])
+    return _worker_agent._figure_bytes(plot(totals), fmt)
 
 
 class VisualizerAgent:
-    """Agent responsible for creating visual representations of expense data"""
+    """
+    Agent responsible for creating visual representations of expense data
     
-    def __init__(self, figsize=(10, 6), style='seaborn-v0_8'):
+    Every chart and render method takes either an expenses DataFrame or an
+    ExpenseCube built from one; a cube skips re-parsing and regrouping.
+    """
+    
+    def __init__(self, figsize=(10, 6), style='seaborn-v0_8', dpi=100, cache_max_bytes=32 * 1024 * 1024,
+                 render_workers=None, max_points=None):
         """
         Initialize the visualizer agent
         
         Args:
             figsize: Default figure size (width, height)
             style: Matplotlib style
+            dpi: Resolution of rendered charts
+            cache_max_bytes: Upper bound on the total size of cached rendered charts
+            render_workers: Processes used to render dashboard charts concurrently;
+                            defaults to one per dashboard chart (up to the CPU count),
+                            0 or 1 renders in this process
+            max_points: Optional cap on points per line; longer lines are
+                        downsampled with LTTB, which keeps their shape
         """
         self.figsize = figsize
-        plt.style.use(style)
+        self.style = style
+        self.dpi = dpi
+        self.max_points = max_points
+        self._style_applied = False
+        self.cache_max_bytes = cache_max_bytes
+        self._renders = OrderedDict()
+        self._render_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # pyplot is not thread-safe; rendering and the cache share one lock
+        self._render_lock = threading.RLock()
+        if render_workers is None:
+            render_workers = min(len(DASHBOARD_CHARTS), os.cpu_count() or 1)
+        self.render_workers = render_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def _pyplot(self):
+        """
+        Import matplotlib.pyplot on first use and apply the configured style
+        
+        Returns:
+            The matplotlib.pyplot module
+        """
+        import matplotlib.pyplot as plt
+        if not self._style_applied:
+            plt.style.use(self.style)
+            self._style_applied = True
+        return plt
+    
+    def _no_data_figure(self, title):
+        """Placeholder figure for charts without data"""
+        plt = self._pyplot()
+        fig, ax = plt.subplots(figsize=self.figsize)
+        ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
+        ax.set_title(title)
+        return fig
+    
+    @staticmethod
+    def _has_column(expenses, column):
+        """True if a DataFrame or ExpenseCube has the date or category column"""
+        if isinstance(expenses, ExpenseCube):
+            return expenses.has_dates if column == 'date' else expenses.has_categories
+        return column in expenses.columns
+    
+    @staticmethod
+    def _category_totals(expenses_df):
+        """Total amount per category, or None if there is nothing to plot"""
+        if expenses_df.empty or not VisualizerAgent._has_column(expenses_df, 'category'):
+            return None
+        if isinstance(expenses_df, ExpenseCube):
+            return expenses_df.category_totals()
+        return expenses_df.groupby('category')['amount'].sum()
+    
+    @staticmethod
+    def _daily_totals(expenses_df):
+        """Total amount per day with a DatetimeIndex in date order, or None if there is nothing to plot"""
+        if expenses_df.empty or not VisualizerAgent._has_column(expenses_df, 'date'):
+            return None
+        if isinstance(expenses_df, ExpenseCube):
+            return expenses_df.daily_totals()
+        return expenses_df['amount'].groupby(pd.to_datetime(expenses_df['date'])).sum()
+    
+    def _at_resolution(self, totals, resolution='auto'):
+        """
+        Re-bucket per-day totals to the chart resolution
+        
+        Args:
+            totals: Series or DataFrame of per-day totals with a sorted DatetimeIndex
+            resolution: 'D', 'W', 'M', or 'auto' to choose from the date span and plot width
+            
+        Returns:
+            Tuple of (totals at the resolution, resolution used)
+        """
+        if resolution == 'auto':
+            # Roughly the share of the figure left for the axes
+            width_px = self.figsize[0] * self.dpi * 0.8
+            resolution = choose_resolution(totals.index[0], totals.index[-1], width_px) if len(totals) else 'D'
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        if resolution != 'D':
+            # Weeks start on Monday and months on the 1st, labelled by their first day
+            totals = totals.resample(RESOLUTIONS[resolution][0], label='left', closed='left').sum()
+        return totals, resolution
+    
+    def _plot_line(self, ax, series, **kwargs):
+        """Plot one dated series, downsampled to max_points and with markers only when sparse"""
+        if self.max_points and len(series) > self.max_points:
+            series = series.iloc[lttb_indices(series.index.asi8, series.to_numpy(), self.max_points)]
+        if len(series) <= MARKER_LIMIT:
+            kwargs.setdefault('marker', 'o')
+        ax.plot(series.index, series.to_numpy(), **kwargs)
+        return series
     
     def create_category_pie_chart(self, expenses_df):
         """
@@ -34,14 +257,15 @@ class VisualizerAgent:
         Returns:
             Matplotlib figure
         """
-        if expenses_df.empty or 'category' not in expenses_df.columns:
-            fig, ax = plt.subplots(figsize=self.figsize)
-            ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
-            ax.set_title('Category-wise Spending')
-            return fig
+        return self._plot_category_pie(self._category_totals(expenses_df))
+    
+    def _plot_category_pie(self, category_totals):
+        """Draw the pie chart from per-category totals (None when there is no data)"""
+        plt = self._pyplot()
+        if category_totals is None:
+            return self._no_data_figure('Category-wise Spending')
         
-        # Group by category and sum amounts
-        category_totals = expenses_df.groupby('category')['amount'].sum().sort_values(ascending=False)
+        category_totals = category_totals.sort_values(ascending=False)
         
         fig, ax = plt.subplots(figsize=self.figsize)
         
@@ -75,19 +299,20 @@ class VisualizerAgent:
         Returns:
             Matplotlib figure
         """
-        if expenses_df.empty or 'category' not in expenses_df.columns:
-            fig, ax = plt.subplots(figsize=self.figsize)
-            ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
-            ax.set_title('Category-wise Spending')
-            return fig
+        return self._plot_category_bar(self._category_totals(expenses_df))
+    
+    def _plot_category_bar(self, category_totals):
+        """Draw the bar chart from per-category totals (None when there is no data)"""
+        plt = self._pyplot()
+        if category_totals is None:
+            return self._no_data_figure('Category-wise Spending')
         
-        # Group by category and sum amounts
-        category_totals = expenses_df.groupby('category')['amount'].sum().sort_values(ascending=True)
+        category_totals = category_totals.sort_values(ascending=True)
         
         fig, ax = plt.subplots(figsize=self.figsize)
         
         # Create bar chart
-        colors = plt.cm.viridis(range(len(category_totals)) / len(category_totals))
+        colors = plt.cm.viridis([i / len(category_totals) for i in range(len(category_totals))])
         bars = ax.barh(category_totals.index, category_totals.values, color=colors)
         
         # Add value labels on bars
@@ -105,144 +330,166 @@ class VisualizerAgent:
         plt.tight_layout()
         return fig
     
-    def create_time_series_chart(self, expenses_df):
+    def create_time_series_chart(self, expenses_df, resolution='auto'):
         """
         Create a time series chart showing spending over time
         
         Args:
             expenses_df: DataFrame with expense data
+            resolution: 'D', 'W', 'M', or 'auto' to aggregate long histories
+                        so every point gets a few pixels
             
         Returns:
             Matplotlib figure
         """
-        if expenses_df.empty or 'date' not in expenses_df.columns:
-            fig, ax = plt.subplots(figsize=self.figsize)
-            ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
-            ax.set_title('Spending Over Time')
-            return fig
-        
-        # Convert date column to datetime
-        expenses_df = expenses_df.copy()
-        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
+        return self._plot_time_series(self._daily_totals(expenses_df), resolution)
+    
+    def _plot_time_series(self, daily_totals, resolution='auto'):
+        """Draw the time series chart from per-day totals (None when there is no data)"""
+        plt = self._pyplot()
+        import matplotlib.dates as mdates
+        if daily_totals is None:
+            return self._no_data_figure('Spending Over Time')
         
-        # Group by date and sum amounts
-        daily_totals = expenses_df.groupby('date')['amount'].sum().sort_index()
+        totals, resolution = self._at_resolution(daily_totals, resolution)
+        _, _, label, date_format = RESOLUTIONS[resolution]
         
         fig, ax = plt.subplots(figsize=self.figsize)
         
         # Create line chart
-        ax.plot(daily_totals.index, daily_totals.values, marker='o', linewidth=2, markersize=8)
-        ax.fill_between(daily_totals.index, daily_totals.values, alpha=0.3)
+        totals = self._plot_line(ax, totals, linewidth=2, markersize=8)
+        ax.fill_between(totals.index, totals.to_numpy(), alpha=0.3)
         
         # Formatting
-        ax.set_xlabel('Date', fontsize=12)
+        ax.set_xlabel('Date' if resolution == 'D' else f'Date ({label.lower()} totals)', fontsize=12)
         ax.set_ylabel('Amount (₹)', fontsize=12)
         ax.set_title('Spending Over Time', fontsize=16, fontweight='bold', pad=20)
         ax.grid(True, alpha=0.3, linestyle='--')
         
         # Format x-axis dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
         plt.xticks(rotation=45)
         
         plt.tight_layout()
         return fig
     
-    def create_daily_spending_chart(self, expenses_df):
+    def create_daily_spending_chart(self, expenses_df, resolution='auto'):
         """
         Create a bar chart showing daily spending amounts
         
+        Over long histories the bars become weekly or monthly totals so
+        each bar stays a few pixels wide.
+        
         Args:
             expenses_df: DataFrame with expense data
+            resolution: 'D', 'W', 'M', or 'auto' to choose from the date span
             
         Returns:
             Matplotlib figure
         """
-        if expenses_df.empty or 'date' not in expenses_df.columns:
-            fig, ax = plt.subplots(figsize=self.figsize)
-            ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
-            ax.set_title('Daily Spending')
-            return fig
-        
-        # Convert date column to datetime
-        expenses_df = expenses_df.copy()
-        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
+        return self._plot_daily_spending(self._daily_totals(expenses_df), resolution)
+    
+    def _plot_daily_spending(self, daily_totals, resolution='auto'):
+        """Draw the daily spending chart from per-day totals (None when there is no data)"""
+        plt = self._pyplot()
+        import matplotlib.dates as mdates
+        if daily_totals is None:
+            return self._no_data_figure('Daily Spending')
         
-        # Group by date and sum amounts
-        daily_totals = expenses_df.groupby('date')['amount'].sum().sort_index()
+        totals, resolution = self._at_resolution(daily_totals, resolution)
+        _, days_per_bar, label, date_format = RESOLUTIONS[resolution]
         
         fig, ax = plt.subplots(figsize=self.figsize)
         
-        # Create bar chart
-        ax.bar(daily_totals.index, daily_totals.values, color='steelblue', alpha=0.7)
+        # Create bar chart; bars start at their period and span most of it
+        align = 'center' if resolution == 'D' else 'edge'
+        ax.bar(totals.index, totals.to_numpy(), width=0.8 * days_per_bar, align=align,
+               color='steelblue', alpha=0.7)
         
         # Add average line
-        avg_spending = daily_totals.mean()
+        avg_spending = totals.mean()
         ax.axhline(y=avg_spending, color='red', linestyle='--', linewidth=2, 
                   label=f'Average: ₹{avg_spending:.2f}')
         
         # Formatting
         ax.set_xlabel('Date', fontsize=12)
         ax.set_ylabel('Amount (₹)', fontsize=12)
-        ax.set_title('Daily Spending', fontsize=16, fontweight='bold', pad=20)
+        ax.set_title(f'{label} Spending', fontsize=16, fontweight='bold', pad=20)
         ax.grid(axis='y', alpha=0.3, linestyle='--')
         ax.legend()
         
         # Format x-axis dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
         plt.xticks(rotation=45)
         
         plt.tight_layout()
         return fig
     
-    def create_trend_analysis(self, expenses_df, category=None):
+    def create_trend_analysis(self, expenses_df, category=None, resolution='auto'):
         """
         Create a trend analysis chart for a specific category or overall
         
         Args:
             expenses_df: DataFrame with expense data
             category: Optional category to filter by
+            resolution: 'D', 'W', 'M', or 'auto' to choose from the date span
             
         Returns:
             Matplotlib figure
         """
-        if expenses_df.empty or 'date' not in expenses_df.columns:
+        plt = self._pyplot()
+        import matplotlib.dates as mdates
+        if expenses_df.empty or not self._has_column(expenses_df, 'date'):
             fig, ax = plt.subplots(figsize=self.figsize)
             ax.text(0.5, 0.5, 'No data available', ha='center', va='center')
             ax.set_title('Trend Analysis')
             return fig
         
-        # Convert date column to datetime
-        expenses_df = expenses_df.copy()
-        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
-        
-        # Filter by category if specified
-        if category:
-            expenses_df = expenses_df[expenses_df['category'] == category]
-        
-        # Group by date and category, calculate totals
-        if 'category' in expenses_df.columns and not category:
-            trend_data = expenses_df.groupby(['date', 'category'])['amount'].sum().unstack(fill_value=0)
+        if isinstance(expenses_df, ExpenseCube):
+            # Per-day totals are already in the cube
+            if category:
+                trend_data = expenses_df.period_totals('D', category=category)
+            elif expenses_df.has_categories:
+                trend_data = expenses_df.period_totals('D', by_category=True)
+            else:
+                trend_data = expenses_df.daily_totals()
         else:
-            trend_data = expenses_df.groupby('date')['amount'].sum()
+            # Convert date column to datetime
+            expenses_df = expenses_df.copy()
+            expenses_df['date'] = pd.to_datetime(expenses_df['date'])
+            
+            # Filter by category if specified
+            if category:
+                expenses_df = expenses_df[expenses_df['category'] == category]
+            
+            # Group by date and category, calculate totals
+            if 'category' in expenses_df.columns and not category:
+                trend_data = expenses_df.groupby(['date', 'category'])['amount'].sum().unstack(fill_value=0)
+            else:
+                trend_data = expenses_df.groupby('date')['amount'].sum()
+        
+        trend_data, resolution = self._at_resolution(trend_data, resolution)
+        _, _, label, date_format = RESOLUTIONS[resolution]
         
         fig, ax = plt.subplots(figsize=self.figsize)
         
-        # Plot trend data
+        # Plot trend data, one line per category
         if isinstance(trend_data, pd.DataFrame):
-            trend_data.plot(kind='line', ax=ax, marker='o', linewidth=2, markersize=6)
+            for column in trend_data.columns:
+                self._plot_line(ax, trend_data[column], label=column, linewidth=2, markersize=6)
         else:
-            ax.plot(trend_data.index, trend_data.values, marker='o', linewidth=2, markersize=6)
+            self._plot_line(ax, trend_data, label=category or 'Total', linewidth=2, markersize=6)
         
         # Formatting
         title = f'Trend Analysis' + (f' - {category}' if category else '')
-        ax.set_xlabel('Date', fontsize=12)
+        ax.set_xlabel('Date' if resolution == 'D' else f'Date ({label.lower()} totals)', fontsize=12)
         ax.set_ylabel('Amount (₹)', fontsize=12)
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
         ax.grid(True, alpha=0.3, linestyle='--')
         ax.legend()
         
         # Format x-axis dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
         plt.xticks(rotation=45)
         
         plt.tight_layout()
@@ -258,20 +505,216 @@ class VisualizerAgent:
         Returns:
             List of matplotlib figures
         """
-        figures = []
+        # Each aggregate is computed once and shared by the charts drawn from it
+        aggregates = self._dashboard_aggregates(expenses_df)
+        return [getattr(self, DASHBOARD_CHARTS[kind][1])(aggregates[DASHBOARD_CHARTS[kind][0]])
+                for kind in self._dashboard_kinds(expenses_df)]
+    
+    @staticmethod
+    def _dashboard_kinds(expenses_df):
+        """Dashboard chart kinds for a DataFrame; time charts need a date column"""
+        kinds = ['pie', 'bar']
+        if VisualizerAgent._has_column(expenses_df, 'date'):
+            kinds += ['time_series', 'daily']
+        return kinds
+    
+    def _dashboard_aggregates(self, expenses_df, kinds=None):
+        """Compute each aggregate needed by the given dashboard charts exactly once"""
+        kinds = self._dashboard_kinds(expenses_df) if kinds is None else kinds
+        needed = {DASHBOARD_CHARTS[kind][0] for kind in kinds}
+        aggregates = {}
+        if 'category_totals' in needed:
+            aggregates['category_totals'] = self._category_totals(expenses_df)
+        if 'daily_totals' in needed:
+            aggregates['daily_totals'] = self._daily_totals(expenses_df)
+        return aggregates
+    
+    def chart_fingerprint(self, expenses_df, kind, fmt='png', **options):
+        """
+        Key identifying a rendered chart: the plotted data plus every option that changes the image
+        
+        Args:
+            expenses_df: DataFrame with expense data
+            kind: Chart kind (see CHART_KINDS)
+            fmt: Image format
+            **options: Extra arguments for the chart's create_* method
+            
+        Returns:
+            Hex digest string
+        """
+        return self._chart_key(self._data_digest(expenses_df), kind, fmt, options)
+    
+    @staticmethod
+    def _data_digest(expenses_df):
+        """Hash of the columns the charts read"""
+        if isinstance(expenses_df, ExpenseCube):
+            return bytes.fromhex(expenses_df.digest)
+        columns = [col for col in ('date', 'amount', 'category') if col in expenses_df.columns]
+        return hashlib.sha1(pd.util.hash_pandas_object(expenses_df[columns], index=False).to_numpy().tobytes()).digest()
+    
+    def _chart_key(self, data_digest, kind, fmt, options):
+        """Combine a data digest with the settings that change a chart's image"""
+        digest = hashlib.sha1(data_digest)
+        settings = (kind, fmt, sorted(options.items()), self.figsize, self.style, self.dpi, self.max_points)
+        digest.update(repr(settings).encode())
+        return digest.hexdigest()
+    
+    def render_chart(self, kind, expenses_df, fmt='png', **options):
+        """
+        Render a chart to image bytes, serving repeat requests from the cache
         
-        # Pie chart
-        figures.append(self.create_category_pie_chart(expenses_df))
+        The figure is closed as soon as it has been rendered, so no matplotlib
+        figures stay open between page views.
         
-        # Bar chart
-        figures.append(self.create_category_bar_chart(expenses_df))
+        Args:
+            kind: Chart kind: 'pie', 'bar', 'time_series', 'daily' or 'trend'
+            expenses_df: DataFrame with expense data
+            fmt: Image format, 'png' or 'svg'
+            **options: Extra arguments for the chart's create_* method
+                       (e.g. category for 'trend')
+            
+        Returns:
+            Image bytes
+        """
+        if kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        key = self.chart_fingerprint(expenses_df, kind, fmt, **options)
+        
+        with self._render_lock:
+            data = self._renders.get(key)
+            if data is not None:
+                self._renders.move_to_end(key)
+                self.cache_hits += 1
+                return data
+            
+            self.cache_misses += 1
+            fig = getattr(self, CHART_KINDS[kind])(expenses_df, **options)
+            data = self._figure_bytes(fig, fmt)
+            self._remember_render(key, data)
+            return data
+    
+    def render_dashboard(self, expenses_df, fmt='png'):
+        """
+        Render the charts of create_summary_dashboard as image bytes
         
-        # Time series (if date data is available)
-        if 'date' in expenses_df.columns:
-            figures.append(self.create_time_series_chart(expenses_df))
-            figures.append(self.create_daily_spending_chart(expenses_df))
+        Charts missing from the cache are drawn from aggregates computed once
+        and rendered concurrently in a pool of headless (Agg) processes, so
+        the dashboard takes about as long as its slowest chart.
         
-        return figures
+        Args:
+            expenses_df: DataFrame with expense data
+            fmt: Image format, 'png' or 'svg'
+            
+        Returns:
+            List of image bytes, in dashboard order
+        """
+        kinds = self._dashboard_kinds(expenses_df)
+        data_digest = self._data_digest(expenses_df)
+        keys = {kind: self._chart_key(data_digest, kind, fmt, {}) for kind in kinds}
+        
+        images = {}
+        with self._render_lock:
+            for kind in kinds:
+                data = self._renders.get(keys[kind])
+                if data is not None:
+                    self._renders.move_to_end(keys[kind])
+                    self.cache_hits += 1
+                    images[kind] = data
+        
+        missing = [kind for kind in kinds if kind not in images]
+        if missing:
+            aggregates = self._dashboard_aggregates(expenses_df, missing)
+            jobs = [(kind, aggregates[DASHBOARD_CHARTS[kind][0]]) for kind in missing]
+            rendered = self._render_jobs(jobs, fmt)
+            with self._render_lock:
+                for kind in missing:
+                    self.cache_misses += 1
+                    images[kind] = rendered[kind]
+                    self._remember_render(keys[kind], rendered[kind])
+        
+        return [images[kind] for kind in kinds]
+    
+    def _render_jobs(self, jobs, fmt):
+        """Render (kind, aggregate) dashboard jobs, in the pool when there is more than one"""
+        pool = self._render_pool() if len(jobs) > 1 else None
+        if pool is not None:
+            try:
+                futures = {kind: pool.submit(_render_dashboard_chart, kind, totals, fmt) for kind, totals in jobs}
+                return {kind: future.result() for kind, future in futures.items()}
+            except BrokenProcessPool:
+                # A dead pool is not worth failing the page for; draw here instead
+                self._discard_pool(pool)
+            except (RuntimeError, OSError):
+                # Shut down by another session between _render_pool and submit
+                pass
+        
+        with self._render_lock:
+            return {kind: self._figure_bytes(getattr(self, DASHBOARD_CHARTS[kind][1])(totals), fmt)
+                    for kind, totals in jobs}
+    
+    def _render_pool(self):
+        """Return the render process pool, starting it on first use (None when disabled)"""
+        if self.render_workers <= 1:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.render_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_render_worker,
+                    initargs=(self.figsize, self.style, self.dpi, self.max_points)
+                )
+            return self._pool
+    
+    def shutdown(self):
+        """Stop the render pool; it is started again if needed"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _discard_pool(self, pool):
+        """Stop a broken pool, unless another session has already replaced it"""
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _figure_bytes(self, fig, fmt):
+        """Save a figure to bytes and close it"""
+        plt = self._pyplot()
+        try:
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt, dpi=self.dpi, bbox_inches='tight')
+            return buf.getvalue()
+        finally:
+            plt.close(fig)
+    
+    def _remember_render(self, key, data):
+        """Add a rendered chart to the LRU, evicting old entries beyond cache_max_bytes"""
+        # Sessions sharing this agent may render the same miss concurrently
+        previous = self._renders.pop(key, None)
+        if previous is not None:
+            self._render_bytes -= len(previous)
+        self._renders[key] = data
+        self._render_bytes += len(data)
+        while self._render_bytes > self.cache_max_bytes and len(self._renders) > 1:
+            _, evicted = self._renders.popitem(last=False)
+            self._render_bytes -= len(evicted)
+    
+    def render_cache_stats(self):
+        """Return hit/miss counters and the size of the rendered-chart cache"""
+        with self._render_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+                'entries': len(self._renders),
+                'bytes': self._render_bytes
+            }
     
     def save_chart_to_bytes(self, fig):
         """
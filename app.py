@@ -13,6 +13,7 @@ from agents.tracker_agent import TrackerAgent
 from agents.advisor_agent import AdvisorAgent
 from agents.visualizer_agent import VisualizerAgent
 from agents.database import DatabaseManager
+from agents.expense_cube import ExpenseCube
 
 
 # Page configuration
@@ -45,15 +46,52 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'tracker' not in st.session_state:
-    st.session_state.tracker = TrackerAgent()
-if 'advisor' not in st.session_state:
-    st.session_state.advisor = AdvisorAgent()
-if 'visualizer' not in st.session_state:
-    st.session_state.visualizer = VisualizerAgent()
-if 'db' not in st.session_state:
-    st.session_state.db = DatabaseManager()
+@st.cache_resource(show_spinner=False)
+def load_shared_agents():
+    """Agents and database layer shared by every session of this server process"""
+    db = DatabaseManager()
+    tracker = TrackerAgent(db=db)
+    return {
+        'db': db,
+        'tracker': tracker,
+        # Share the tracker's running aggregates so analyses see its inserts immediately
+        'advisor': AdvisorAgent(db=db, analytics=tracker.analytics),
+        'visualizer': VisualizerAgent()
+    }
+
+
+# Initialize session state with the process-wide agents
+for name, agent in load_shared_agents().items():
+    if name not in st.session_state:
+        st.session_state[name] = agent
+
+
+# Reads are cached under the database's data version: reruns without writes
+# reuse them, and the next insert (from any session) moves every page to a new key.
+# The leading underscore keeps Streamlit from hashing the DatabaseManager.
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_expense_totals(_db, db_path, data_version):
+    """Overall totals for one data version"""
+    return _db.get_expense_totals()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_category_summary(_db, db_path, data_version):
+    """All-time category summary for one data version"""
+    return _db.get_category_summary()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_recent_expenses(_db, db_path, data_version, limit):
+    """Most recent expenses for one data version"""
+    return _db.get_recent_expenses(limit=limit)
+
+
+# The cube is immutable, so one instance is shared by all sessions instead of copied
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_expense_cube(_db, db_path, data_version):
+    """All expenses, parsed and aggregated once per data version"""
+    return ExpenseCube(_db.get_all_expenses())
 
 
 def main():
@@ -98,35 +136,34 @@ def show_home_page():
     """Display home page with overview"""
     col1, col2, col3 = st.columns(3)
     
-    # Get summary statistics
-    all_expenses = st.session_state.db.get_all_expenses()
+    # Get summary statistics (aggregated in the database, cached until the next write)
+    db = st.session_state.db
+    data_version = db.get_data_version()
+    totals = load_expense_totals(db, db.db_path, data_version)
     
     with col1:
-        total_spent = all_expenses['amount'].sum() if not all_expenses.empty else 0
-        st.metric("💵 Total Spent", f"₹{total_spent:.2f}")
+        st.metric("💵 Total Spent", f"₹{totals['total_spent']:.2f}")
     
     with col2:
-        num_transactions = len(all_expenses) if not all_expenses.empty else 0
-        st.metric("📝 Transactions", num_transactions)
+        st.metric("📝 Transactions", totals['num_transactions'])
     
     with col3:
-        avg_transaction = (all_expenses['amount'].mean() if not all_expenses.empty else 0)
-        st.metric("📊 Avg Transaction", f"₹{avg_transaction:.2f}")
+        st.metric("📊 Avg Transaction", f"₹{totals['avg_transaction']:.2f}")
     
     st.markdown("---")
     
     # Quick stats
-    if not all_expenses.empty:
+    if totals['num_transactions'] > 0:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("💰 Spending by Category")
-            category_summary = st.session_state.db.get_category_summary()
+            category_summary = load_category_summary(db, db.db_path, data_version)
             st.dataframe(category_summary, use_container_width=True)
         
         with col2:
             st.subheader("📅 Recent Expenses")
-            recent_expenses = all_expenses.head(10)
+            recent_expenses = load_recent_expenses(db, db.db_path, data_version, 10)
             st.dataframe(recent_expenses[['date', 'description', 'amount', 'category']], use_container_width=True)
     else:
         st.info("👋 Welcome to BudgetBuddy AI! Start by adding your expenses using the 'Add Expenses' page.")
@@ -147,17 +184,48 @@ def show_add_expenses_page():
             type=['csv'],
             accept_multiple_files=True
         )
+        account = st.text_input(
+            "Account or card (optional)",
+            help="Identical purchases (same date, description and amount) are stored once per account. "
+                 "Name the account when uploading statements of different cards, unless the CSV has an account column."
+        ).strip() or None
         
         if uploaded_files:
             if st.button("📤 Upload & Process"):
                 total_processed = 0
-                for file in uploaded_files:
+                if len(uploaded_files) == 1:
+                    # A single (possibly very large) export is streamed in chunks
+                    file = uploaded_files[0]
+                    progress = st.empty()
                     try:
-                        df, count = st.session_state.tracker.process_and_store_csv(file)
-                        total_processed += count
-                        st.success(f"✅ Processed {count} expenses from {file.name}")
+                        result = st.session_state.tracker.process_and_store_csv_streaming(
+                            file,
+                            source=account,
+                            progress_callback=lambda number, chunk_count, stored: progress.text(
+                                f"⏳ {file.name}: chunk {number} stored ({stored} expenses so far)"
+                            )
+                        )
+                        progress.empty()
+                        total_processed += result['inserted']
+                        st.success(f"✅ Processed {result['inserted']} new expenses from {file.name}")
+                        if result['duplicates']:
+                            st.info(f"ℹ️ Skipped {result['duplicates']} expenses already in your database "
+                                    f"(identical date, description and amount from the same account)")
                     except Exception as e:
                         st.error(f"❌ Error processing {file.name}: {str(e)}")
+                else:
+                    # Several statements are parsed in parallel and stored in one write
+                    with st.spinner(f"Processing {len(uploaded_files)} files..."):
+                        report = st.session_state.tracker.ingest_files(uploaded_files, source=account)
+                    for item in report:
+                        if item['error']:
+                            st.error(f"❌ Error processing {item['name']}: {item['error']}")
+                        else:
+                            total_processed += item['inserted']
+                            st.success(f"✅ Processed {item['inserted']} new expenses from {item['name']}")
+                            if item['duplicates']:
+                                st.info(f"ℹ️ Skipped {item['duplicates']} expenses from {item['name']} already in your database "
+                                        f"(identical date, description and amount from the same account)")
                 
                 if total_processed > 0:
                     st.balloons()
@@ -212,80 +280,70 @@ def show_analysis_page():
         end_date = st.date_input("End Date", value=datetime.now().date())
     
     if st.button("🔍 Analyze"):
-        # Get expenses for the period
-        all_expenses = st.session_state.db.get_all_expenses()
+        # Analyze the period from the running aggregates (no raw rows are read)
+        analysis_result = st.session_state.advisor.analyze_period(start_date, end_date)
         
-        if not all_expenses.empty:
-            # Filter by date range
-            all_expenses['date'] = pd.to_datetime(all_expenses['date'])
-            filtered_expenses = all_expenses[
-                (all_expenses['date'].dt.date >= start_date) &
-                (all_expenses['date'].dt.date <= end_date)
-            ]
+        if analysis_result['num_transactions']:
             
-            if not filtered_expenses.empty:
-                # Perform analysis
-                analysis_result = st.session_state.advisor.analyze_spending_patterns(filtered_expenses)
-                
-                # Display metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("💵 Total Spent", f"₹{analysis_result['total_spent']:.2f}")
-                
-                with col2:
-                    st.metric("📊 Avg Daily", f"₹{analysis_result['average_daily']:.2f}")
-                
-                with col3:
-                    st.metric("📝 Transactions", analysis_result['num_transactions'])
-                
-                with col4:
-                    st.metric("🏆 Top Category", analysis_result['top_category'] or "N/A")
-                
-                st.markdown("---")
-                
-                # Agent-detected trends
-                if analysis_result.get('trends'):
-                    st.markdown("---")
-                    st.subheader("📈 Spending Trends")
-                    for trend in analysis_result['trends']:
-                        if "Increasing" in trend:
-                            st.warning(f"🔺 {trend}")
-                        else:
-                            st.success(f"🔻 {trend}")
-                
-                # Agent insights
-                if analysis_result.get('insights'):
-                    st.markdown("---")
-                    st.subheader("🧠 Key Insights")
-                    for insight in analysis_result['insights']:
-                        st.info(f"📌 {insight}")
-                
-                # Category breakdown
+            # Display metrics
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("💵 Total Spent", f"₹{analysis_result['total_spent']:.2f}")
+            
+            with col2:
+                st.metric("📊 Avg Daily", f"₹{analysis_result['average_daily']:.2f}")
+            
+            with col3:
+                st.metric("📝 Transactions", analysis_result['num_transactions'])
+            
+            with col4:
+                st.metric("🏆 Top Category", analysis_result['top_category'] or "N/A")
+            
+            st.markdown("---")
+            
+            # Agent-detected trends
+            if analysis_result.get('trends'):
                 st.markdown("---")
-                st.subheader("📊 Category Breakdown")
-                category_df = pd.DataFrame([
-                    {'Category': cat, 'Amount': amt, 
-                     'Percentage': f"{(amt/analysis_result['total_spent']*100):.1f}%"}
-                    for cat, amt in sorted(analysis_result['category_breakdown'].items(),
-                                         key=lambda x: x[1], reverse=True)
-                ])
-                st.dataframe(category_df, use_container_width=True, hide_index=True)
-                
-                # Overspending detection
+                st.subheader("📈 Spending Trends")
+                for trend in analysis_result['trends']:
+                    if "Increasing" in trend:
+                        st.warning(f"🔺 {trend}")
+                    else:
+                        st.success(f"🔻 {trend}")
+            
+            # Agent insights
+            if analysis_result.get('insights'):
                 st.markdown("---")
-                overspending = st.session_state.advisor.detect_overspending(
-                    analysis_result['category_breakdown']
-                )
-                
-                if overspending:
-                    st.subheader("⚠️ Overspending Alerts")
-                    for item in overspending:
-                        st.warning(f"**{item['category']}**: {item['percentage']:.1f}% of total spending (₹{item['amount']:.2f})")
-                else:
-                    st.success("✅ No significant overspending detected!")
+                st.subheader("🧠 Key Insights")
+                for insight in analysis_result['insights']:
+                    st.info(f"📌 {insight}")
+            
+            # Category breakdown
+            st.markdown("---")
+            st.subheader("📊 Category Breakdown")
+            category_df = pd.DataFrame([
+                {'Category': cat, 'Amount': amt, 
+                 'Percentage': f"{(amt/analysis_result['total_spent']*100):.1f}%"}
+                for cat, amt in sorted(analysis_result['category_breakdown'].items(),
+                                     key=lambda x: x[1], reverse=True)
+            ])
+            st.dataframe(category_df, use_container_width=True, hide_index=True)
+            
+            # Overspending detection
+            st.markdown("---")
+            overspending = st.session_state.advisor.detect_overspending(
+                analysis_result['category_breakdown']
+            )
+            
+            if overspending:
+                st.subheader("⚠️ Overspending Alerts")
+                for item in overspending:
+                    st.warning(f"**{item['category']}**: {item['percentage']:.1f}% of total spending (₹{item['amount']:.2f})")
             else:
-                st.info("No expenses found for the selected date range.")
+                st.success("✅ No significant overspending detected!")
+        elif st.session_state.db.has_expenses():
+            st.info("No expenses found for the selected date range.")
         else:
             st.info("No expenses in database. Please add expenses first.")
 
@@ -308,12 +366,14 @@ def show_advice_page():
             expenses = st.session_state.db.get_expenses_by_month(year, month)
             
             if not expenses.empty:
-                # Generate comprehensive analysis
-                analysis = st.session_state.advisor.provide_monthly_analysis(expenses, year, month)
+                # Generate comprehensive analysis; advice text is streamed as it is generated
+                analysis = st.session_state.advisor.provide_monthly_analysis(
+                    ExpenseCube(expenses), year, month, stream=True
+                )
                 
                 # Display AI advice
                 st.markdown("### 💡 AI Financial Insights")
-                st.markdown(analysis['ai_advice'])
+                advice_text = st.write_stream(analysis['ai_advice'])
                 
                 st.markdown("---")
                 
@@ -325,9 +385,12 @@ def show_advice_page():
                 
                 st.markdown("---")
                 
-                # Store advice
-                st.session_state.db.insert_advice(analysis['ai_advice'])
-                st.success("✅ Advice saved to your history!")
+                # Store advice (a cached result was already saved when first generated)
+                if analysis['cached']:
+                    st.info("ℹ️ No new expenses this month - showing your saved advice.")
+                else:
+                    st.session_state.db.insert_advice(advice_text)
+                    st.success("✅ Advice saved to your history!")
             else:
                 st.warning(f"No expenses found for {month}/{year}. Please add expenses first.")
     
@@ -347,8 +410,9 @@ def show_visualizations_page():
     """Display page for visualizations"""
     st.header("📉 Spending Visualizations")
     
-    # Get all expenses
-    all_expenses = st.session_state.db.get_all_expenses()
+    # Get all expenses, parsed and aggregated once per data version for every chart
+    db = st.session_state.db
+    all_expenses = load_expense_cube(db, db.db_path, db.get_data_version())
     
     if all_expenses.empty:
         st.info("No expenses to visualize. Please add expenses first.")
@@ -362,38 +426,32 @@ def show_visualizations_page():
     
     if viz_option == "Dashboard View":
         st.subheader("📊 Comprehensive Dashboard")
-        figures = st.session_state.visualizer.create_summary_dashboard(all_expenses)
-        for fig in figures:
-            st.pyplot(fig)
+        for image in st.session_state.visualizer.render_dashboard(all_expenses):
+            st.image(image)
     
     elif viz_option == "Pie Chart":
         st.subheader("🥧 Spending by Category (Pie Chart)")
-        fig = st.session_state.visualizer.create_category_pie_chart(all_expenses)
-        st.pyplot(fig)
+        st.image(st.session_state.visualizer.render_chart('pie', all_expenses))
     
     elif viz_option == "Bar Chart":
         st.subheader("📊 Spending by Category (Bar Chart)")
-        fig = st.session_state.visualizer.create_category_bar_chart(all_expenses)
-        st.pyplot(fig)
+        st.image(st.session_state.visualizer.render_chart('bar', all_expenses))
     
     elif viz_option == "Time Series":
         st.subheader("📈 Spending Over Time")
-        fig = st.session_state.visualizer.create_time_series_chart(all_expenses)
-        st.pyplot(fig)
+        st.image(st.session_state.visualizer.render_chart('time_series', all_expenses))
     
     elif viz_option == "Daily Spending":
         st.subheader("📅 Daily Spending Breakdown")
-        fig = st.session_state.visualizer.create_daily_spending_chart(all_expenses)
-        st.pyplot(fig)
+        st.image(st.session_state.visualizer.render_chart('daily', all_expenses))
     
     elif viz_option == "Trend Analysis":
         st.subheader("📉 Trend Analysis")
-        categories = st.session_state.db.get_category_summary()['category'].tolist()
+        categories = all_expenses.category_totals().sort_values(ascending=False).index.tolist()
         if categories:
             selected_category = st.selectbox("Select Category", ["All"] + categories)
             category = None if selected_category == "All" else selected_category
-            fig = st.session_state.visualizer.create_trend_analysis(all_expenses, category)
-            st.pyplot(fig)
+            st.image(st.session_state.visualizer.render_chart('trend', all_expenses, category=category))
         else:
             st.info("No categories available for trend analysis.")
 
@@ -0,0 +1,103 @@
+"""
+Benchmark for AdvisorAgent.analyze_spending_patterns
+- Legacy implementation: mutates its input and builds string year_week keys row by row
+- Current implementation: read-only input, numeric week buckets, one grouped pass
+
+Reports wall time and peak traced memory (tracemalloc) at each size. Input dates
+are ISO strings, as returned by DatabaseManager. The legacy implementation is
+skipped above LEGACY_MAX_ROWS, where it needs several GiB.
+
+Usage:
+    python benchmarks/bench_advisor.py [rows ...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from agents.advisor_agent import AdvisorAgent
+
+
+LEGACY_MAX_ROWS = 2_000_000
+
+
+def legacy_aggregate(expenses_df):
+    """Aggregation steps of the original analyze_spending_patterns"""
+    total_spent = expenses_df['amount'].sum()
+    category_summary = expenses_df.groupby('category')['amount'].sum().to_dict()
+    expenses_df['date'] = pd.to_datetime(expenses_df['date'])
+    days = (expenses_df['date'].max() - expenses_df['date'].min()).days + 1
+    expenses_df['week'] = expenses_df['date'].dt.isocalendar().week
+    expenses_df['year'] = expenses_df['date'].dt.isocalendar().year
+    expenses_df['year_week'] = expenses_df['year'].astype(str) + '_' + expenses_df['week'].astype(str)
+    weekly_spending = expenses_df.groupby('year_week')['amount'].sum().sort_index()
+    return total_spent, category_summary, days, weekly_spending
+
+
+def make_expenses(rows, years=5, seed=42):
+    """Random expenses over several years with ISO date strings"""
+    rng = np.random.default_rng(seed)
+    categories = np.array(["Food", "Transport", "Shopping", "Bills", "Health", "Entertainment", "Education"])
+    days = rng.integers(0, 365 * years, rows)
+    dates = (np.datetime64('2020-01-01') + days).astype(str)
+    return pd.DataFrame({
+        'date': dates,
+        'description': 'Item',
+        'amount': rng.uniform(10, 2000, rows).round(2),
+        'category': categories[rng.integers(0, len(categories), rows)]
+    })
+
+
+def measure(func, *args):
+    """Return (seconds, peak MiB) for one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def check_equivalent(df, advisor):
+    """The rewrite must agree with the legacy aggregates (weeks ordered chronologically)"""
+    total, categories, days, _ = legacy_aggregate(df.copy())
+    aggregates = advisor._aggregate_expenses(df)
+    assert np.isclose(total, aggregates['total_spent'])
+    assert categories.keys() == aggregates['category_totals'].keys()
+    assert all(np.isclose(categories[c], aggregates['category_totals'][c]) for c in categories)
+    assert days == aggregates['days']
+
+    dates = pd.to_datetime(df['date'])
+    iso = dates.dt.isocalendar()
+    weekly = df['amount'].groupby([iso.year, iso.week]).sum().sort_index().tolist()
+    assert np.allclose(weekly, aggregates['weekly_totals'])
+
+
+def run(sizes):
+    """Time both implementations at each size and print a table"""
+    advisor = AdvisorAgent.__new__(AdvisorAgent)
+    check_equivalent(make_expenses(20_000), advisor)
+
+    print(f"{'rows':>12}{'before (s)':>12}{'before (MiB)':>14}{'after (s)':>11}{'after (MiB)':>13}{'speedup':>9}")
+    for rows in sizes:
+        df = make_expenses(rows)
+        before = measure(legacy_aggregate, df.copy()) if rows <= LEGACY_MAX_ROWS else None
+        snapshot = df.copy()
+        after = measure(advisor.analyze_spending_patterns, df)
+        assert df.equals(snapshot), "analyze_spending_patterns modified its input"
+        del snapshot
+        if before is None:
+            print(f"{rows:>12,}{'-':>12}{'-':>14}{after[0]:>11.2f}{after[1]:>13.0f}{'-':>9}")
+        else:
+            print(f"{rows:>12,}{before[0]:>12.2f}{before[1]:>14.0f}{after[0]:>11.2f}{after[1]:>13.0f}"
+                  f"{before[0] / after[0]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 10_000_000])
@@ -0,0 +1,87 @@
+"""
+Benchmark for keyword categorization
+Compares the compiled single-pass categorizer with the original nine-scan
+categorize_auto and checks that both agree
+
+Usage:
+    python benchmarks/bench_categorizer.py [rows]
+"""
+
+import os
+import sys
+import time
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+from agents.tracker_agent import TrackerAgent, categorize_auto
+
+
+def legacy_categorize_auto(df):
+    """The original implementation: one regex scan per category, later ones win"""
+    keywords = {
+        "Food": ["restaurant", "groceries", "meal", "snack", "food", "cafe", "coffee", "starbucks", "dining", "lunch", "dinner"],
+        "Transport": ["uber", "bus", "train", "fuel", "taxi", "metro", "flight", "transport", "travel", "ride"],
+        "Entertainment": ["movie", "game", "netflix", "cinema", "theater", "entertainment", "spotify", "music"],
+        "Utilities": ["electricity", "water", "gas", "wifi", "internet", "mobile", "phone", "utility", "bill"],
+        "Shopping": ["amazon", "flipkart", "shopping", "mall", "store", "purchase", "buy", "order"],
+        "Health": ["medical", "pharmacy", "hospital", "doctor", "medicine", "health", "clinic"],
+        "Education": ["school", "tuition", "course", "education", "university", "book", "study"],
+        "Bills": ["electricity", "water", "rent", "insurance", "loan", "emi", "bill"],
+        "Savings": ["bank", "deposit", "investment", "sip", "mutual"]
+    }
+
+    for key, words in keywords.items():
+        df.loc[df['description'].str.lower().str.contains('|'.join(words), na=False), 'category'] = key
+
+
+def random_descriptions(rows):
+    """Generate descriptions mixing merchant names, keywords and noise"""
+    words = [
+        "Starbucks coffee", "Uber ride", "Amazon order", "Electricity bill", "Netflix",
+        "Groceries", "Pharmacy", "Bookstore", "Gas station", "Mutual fund SIP",
+        "Dinner at restaurant", "Metro card", "Water bill", "Rent", "Misc", "ATM",
+        "Movie tickets", "Premium plan", "Gym", "Phone recharge"
+    ]
+    rng = random.Random(7)
+    return [f"{rng.choice(words)} #{rng.randrange(1000)}" for _ in range(rows)]
+
+
+def check_sample_files():
+    """Both implementations must agree on the bundled sample files"""
+    tracker = TrackerAgent.__new__(TrackerAgent)
+    for path in [os.path.join(ROOT, "data", name) for name in ("sample_expenses.csv", "combined_expenses.csv")]:
+        df = tracker._read_csv(path)
+        df.columns = [c.strip().lower() for c in df.columns]
+        df['category'] = 'Uncategorized'
+        legacy = df.copy()
+        legacy_categorize_auto(legacy)
+        categorize_auto(df)
+        status = "✅" if df['category'].equals(legacy['category']) else "❌"
+        print(f"{status} {path}: {dict(df['category'].value_counts())}")
+
+
+def run(rows=1_000_000):
+    """Time both implementations on the same descriptions"""
+    df = pd.DataFrame({'description': random_descriptions(rows), 'category': 'Uncategorized'})
+
+    legacy = df.copy()
+    start = time.perf_counter()
+    legacy_categorize_auto(legacy)
+    legacy_s = time.perf_counter() - start
+
+    compiled = df.copy()
+    start = time.perf_counter()
+    categorize_auto(compiled)
+    compiled_s = time.perf_counter() - start
+
+    same = compiled['category'].equals(legacy['category'])
+    print(f"{rows:,} descriptions: before {legacy_s:.2f}s, after {compiled_s:.2f}s "
+          f"({legacy_s / compiled_s:.1f}x), identical output: {same}")
+
+
+if __name__ == "__main__":
+    check_sample_files()
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
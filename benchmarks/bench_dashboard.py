@@ -0,0 +1,78 @@
+"""
+Benchmark for VisualizerAgent.render_dashboard
+- Serial: every chart drawn one after another in this process
+- Pooled: shared aggregates computed once, charts drawn concurrently in Agg worker processes
+
+Also prints the time of each chart on its own; with enough cores the pooled
+dashboard should take about as long as the slowest one. The pool is started
+and warmed before timing, as it is in a long-running app. Caching is defeated
+by using a fresh agent (serial) or fresh data (pooled) for every run.
+
+Usage:
+    python benchmarks/bench_dashboard.py [rows ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+from agents.visualizer_agent import VisualizerAgent, DASHBOARD_CHARTS
+
+
+def make_expenses(rows, days=365, seed=42):
+    """Random expenses over a number of days with ISO date strings"""
+    rng = np.random.default_rng(seed)
+    categories = np.array(["Food", "Transport", "Shopping", "Bills", "Health", "Entertainment", "Education"])
+    dates = (np.datetime64('2024-01-01') + rng.integers(0, days, rows)).astype(str)
+    return pd.DataFrame({
+        'date': dates,
+        'amount': rng.uniform(10, 2000, rows).round(2),
+        'category': categories[rng.integers(0, len(categories), rows)]
+    })
+
+
+def timed(func, *args):
+    """Return (seconds, result) for one call"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(sizes, workers):
+    """Time serial and pooled dashboards at each size and print a table"""
+    pooled = VisualizerAgent(render_workers=workers)
+    # Start every worker so process startup is not counted
+    pooled.render_dashboard(make_expenses(100, seed=0))
+
+    print(f"{os.cpu_count()} CPUs, {workers} render workers")
+    print(f"{'rows':>10}{'serial (s)':>12}{'slowest (s)':>13}{'pooled (s)':>12}{'speedup':>9}")
+    try:
+        for rows in sizes:
+            df = make_expenses(rows)
+            serial = VisualizerAgent(render_workers=0)
+            serial_seconds, serial_images = timed(serial.render_dashboard, df)
+
+            single = VisualizerAgent(render_workers=0)
+            aggregates = single._dashboard_aggregates(df)
+            slowest = 0.0
+            for kind, (aggregate, plot) in DASHBOARD_CHARTS.items():
+                seconds, _ = timed(lambda: single._figure_bytes(getattr(single, plot)(aggregates[aggregate]), 'png'))
+                slowest = max(slowest, seconds)
+
+            pooled_seconds, pooled_images = timed(pooled.render_dashboard, df)
+            assert pooled_images == serial_images, "pooled rendering produced different images"
+            print(f"{rows:>10,}{serial_seconds:>12.2f}{slowest:>13.2f}{pooled_seconds:>12.2f}"
+                  f"{serial_seconds / pooled_seconds:>8.1f}x")
+    finally:
+        pooled.shutdown()
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000], len(DASHBOARD_CHARTS))
@@ -0,0 +1,159 @@
+"""
+Benchmarks for DatabaseManager
+- Per-call latency of the pooled connection layer vs a fresh connection per call
+- Month lookups on a large table: strftime() filters vs indexed date range scans
+
+Usage:
+    python benchmarks/bench_database.py [iterations] [rows]
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from agents.database import DatabaseManager, _month_bounds
+
+
+LEGACY_MONTH_QUERY = """
+    SELECT category, SUM(amount) as total, COUNT(*) as count
+    FROM expenses
+    WHERE strftime('%Y', date) = ? AND strftime('%m', date) = ?
+    GROUP BY category
+    ORDER BY total DESC
+"""
+
+RANGE_MONTH_QUERY = """
+    SELECT category, SUM(amount) as total, COUNT(*) as count
+    FROM expenses
+    WHERE date >= ? AND date < ?
+    GROUP BY category
+    ORDER BY total DESC
+"""
+
+
+def legacy_insert_expense(db_path, date, description, amount, category):
+    """Pre-pool behaviour: connect, insert, commit, close"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO expenses (date, description, amount, category)
+        VALUES (?, ?, ?, ?)
+    """, (date, description, amount, category))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_category_summary(db_path):
+    """Pre-pool behaviour: connect, query, close"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("""
+        SELECT category, SUM(amount) as total, COUNT(*) as count
+        FROM expenses
+        GROUP BY category
+        ORDER BY total DESC
+    """, conn)
+    conn.close()
+    return df
+
+
+def legacy_insert_advice(db_path, advice_text):
+    """Pre-pool behaviour: connect, insert, commit, close"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO advice (text) VALUES (?)", (advice_text,))
+    conn.commit()
+    conn.close()
+
+
+def time_per_call(func, iterations):
+    """Return mean latency of func in microseconds"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations=500):
+    """Run the before/after comparison and print a table"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        pooled_path = os.path.join(tmp, "pooled.db")
+
+        # Both databases get the same schema; only the legacy one stays in rollback-journal mode
+        DatabaseManager(legacy_path).close()
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        db = DatabaseManager(pooled_path)
+
+        cases = [
+            ("insert_expense",
+             lambda i: legacy_insert_expense(legacy_path, "2025-01-15", f"Item {i}", 10.0, "Food"),
+             lambda i: db.insert_expense("2025-01-15", f"Item {i}", 10.0, "Food")),
+            ("get_category_summary",
+             lambda i: legacy_get_category_summary(legacy_path),
+             lambda i: db.get_category_summary()),
+            ("insert_advice",
+             lambda i: legacy_insert_advice(legacy_path, f"Advice {i}"),
+             lambda i: db.insert_advice(f"Advice {i}")),
+        ]
+
+        print(f"{'method':<24}{'before (µs)':>14}{'after (µs)':>14}{'speedup':>10}")
+        for name, before, after in cases:
+            before_us = time_per_call(before, iterations)
+            after_us = time_per_call(after, iterations)
+            print(f"{name:<24}{before_us:>14.1f}{after_us:>14.1f}{before_us / after_us:>9.1f}x")
+
+        db.close()
+
+
+def populate(db, rows, years=5):
+    """Fill the expenses table with random rows spread over several years"""
+    categories = ["Food", "Transport", "Shopping", "Bills", "Health", "Entertainment"]
+    first_day = pd.Timestamp("2020-01-01")
+    rng = random.Random(42)
+    batch = (
+        ((first_day + pd.Timedelta(days=rng.randrange(365 * years))).strftime('%Y-%m-%d'),
+         f"Item {i}", round(rng.uniform(10, 2000), 2), rng.choice(categories))
+        for i in range(rows)
+    )
+    with db.transaction() as conn:
+        conn.executemany("""
+            INSERT INTO expenses (date, description, amount, category)
+            VALUES (?, ?, ?, ?)
+        """, batch)
+
+
+def run_month_queries(rows=1_000_000, repeats=5):
+    """Compare strftime() month filters against indexed range scans"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "months.db"))
+        print(f"\nPopulating {rows:,} rows...")
+        populate(db, rows)
+        conn = db._connect()
+        conn.execute("ANALYZE")
+
+        plan = conn.execute("EXPLAIN QUERY PLAN " + RANGE_MONTH_QUERY, _month_bounds(2023, 6)).fetchall()
+        print("Range query plan:", "; ".join(row[-1] for row in plan))
+
+        def timed(query, params):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                conn.execute(query, params).fetchall()
+            return (time.perf_counter() - start) / repeats * 1000
+
+        legacy_ms = timed(LEGACY_MONTH_QUERY, ("2023", "06"))
+        range_ms = timed(RANGE_MONTH_QUERY, _month_bounds(2023, 6))
+        print(f"{'month summary':<24}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+        print(f"{'get_category_summary':<24}{legacy_ms:>14.1f}{range_ms:>14.1f}{legacy_ms / range_ms:>9.1f}x")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
+    run_month_queries(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
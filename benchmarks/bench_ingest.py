@@ -0,0 +1,71 @@
+"""
+Benchmark for multi-file CSV ingestion
+Compares storing files one after another with TrackerAgent.ingest_files
+
+Usage:
+    python benchmarks/bench_ingest.py [files] [rows_per_file]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from agents.database import DatabaseManager
+from agents.tracker_agent import TrackerAgent
+
+
+def write_statements(directory, files, rows):
+    """Write statement style CSVs of different cards, without a category column"""
+    rng = np.random.default_rng(0)
+    merchants = ['Uber ride', 'Starbucks coffee', 'Amazon order', 'Rent', 'Electricity bill', 'Pharmacy']
+    paths = []
+    for number in range(files):
+        df = pd.DataFrame({
+            'Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), 'D'),
+            'Merchant': rng.choice(merchants, rows),
+            'Amt': rng.uniform(1, 500, rows).round(2),
+            # Identical purchases on two cards are two expenses
+            'Card': f"card-{number:02d}",
+        })
+        path = os.path.join(directory, f"statement_{number:02d}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def run(files=8, rows=100_000):
+    """Time serial and parallel ingestion of the same statements"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_statements(tmp, files, rows)
+
+        serial = TrackerAgent(DatabaseManager(os.path.join(tmp, "serial.db")))
+        start = time.perf_counter()
+        results = [serial.process_and_store_csv(path) for path in paths]
+        serial_s = time.perf_counter() - start
+        serial_parsed = sum(len(df) for df, _ in results)
+        serial_inserted = sum(inserted for _, inserted in results)
+
+        parallel = TrackerAgent(DatabaseManager(os.path.join(tmp, "parallel.db")))
+        start = time.perf_counter()
+        report = parallel.ingest_files(paths)
+        parallel_s = time.perf_counter() - start
+        parallel_parsed = sum(item['count'] for item in report)
+        parallel_inserted = sum(item['inserted'] for item in report)
+
+        same = serial.db.get_category_summary().equals(parallel.db.get_category_summary())
+        print(f"{files} files x {rows:,} rows on {os.cpu_count()} CPUs")
+        # Parsed and inserted differ by the duplicates the content hash drops
+        print(f"serial:   {serial_parsed:,} rows parsed, {serial_inserted:,} inserted in {serial_s:.2f}s")
+        print(f"parallel: {parallel_parsed:,} rows parsed, {parallel_inserted:,} inserted in {parallel_s:.2f}s "
+              f"({serial_s / parallel_s:.1f}x)")
+        print(f"identical category totals: {same}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
@@ -0,0 +1,99 @@
+"""
+Startup benchmark for BudgetBuddy AI
+- Cold `import agents`: must stay cheap and must not pull in heavy dependencies
+- App cold start: everything app.py runs before main() renders the first
+  page (imports, page config, the shared agents), executed from app.py itself
+  so the measurement follows the app; needs streamlit installed
+
+Each measurement runs in a fresh interpreter, inside a scratch directory so
+the default database path never touches the real database, and fails if it
+exceeds its budget or imports a module that should only load on demand.
+
+Usage:
+    python benchmarks/bench_startup.py [agents_budget_ms] [app_budget_ms]
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only inside the functions that need them
+HEAVY_MODULES = ["matplotlib", "transformers", "torch"]
+
+AGENTS_SNIPPET = "import agents"
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+APP_SNIPPET = f"""
+source = open({APP_PATH!r}, encoding="utf-8").read()
+setup = source[:source.index("\\ndef main():")]
+exec(compile(setup, {APP_PATH!r}, "exec"), {{"__name__": "app"}})
+"""
+
+MEASURE = """
+import sys, time, json
+start = time.perf_counter()
+{snippet}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(snippet, workdir, repeats=5):
+    """Run snippet in fresh interpreters and return (best seconds, loaded modules)"""
+    code = MEASURE.format(snippet=snippet)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    best = None
+    modules = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best:
+            best = result["seconds"]
+        modules = result["modules"]
+    return best, modules
+
+
+def run(agents_budget_ms=50, app_budget_ms=3000):
+    """Measure both startup paths and assert their budgets"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Agents open database/budgetbuddy.db relative to the working directory
+        os.makedirs(os.path.join(tmp, "database"))
+        failures = []
+
+        checks = [("import agents", AGENTS_SNIPPET, agents_budget_ms, HEAVY_MODULES + ["pandas"])]
+        if importlib.util.find_spec("streamlit") is not None:
+            checks.append(("app cold start", APP_SNIPPET, app_budget_ms, HEAVY_MODULES))
+        else:
+            print("⚠️ streamlit is not installed; skipping the app cold start")
+
+        print(f"{'startup':<20}{'time (ms)':>12}{'budget (ms)':>14}")
+        for name, snippet, budget_ms, forbidden in checks:
+            seconds, modules = measure(snippet, tmp)
+            elapsed_ms = seconds * 1000
+            print(f"{name:<20}{elapsed_ms:>12.1f}{budget_ms:>14.0f}")
+
+            loaded = [m for m in forbidden if m in modules]
+            if loaded:
+                failures.append(f"{name} imported {', '.join(loaded)}")
+            if elapsed_ms > budget_ms:
+                failures.append(f"{name} took {elapsed_ms:.1f} ms (budget {budget_ms} ms)")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 3000)